@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import db, mail, metrics, slow_queries, timing
+
+        connection_created.connect(db.configure_sqlite)
+        if settings.DB_HEALTH_CHECKS:
+            request_started.connect(db.check_connections)
+        timing.install()
+        metrics.install()
+        metrics.gauges.append(mail.queue_depth)
+        if settings.SLOW_QUERY_THRESHOLD_MS is not None:
+            connection_created.connect(slow_queries.install)
@@ -0,0 +1,93 @@
+import json
+import math
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, share):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(share * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def measure(request, repeat=20, warmup=2, before=None):
+    """Замеряет задержку, число запросов к БД и пик памяти.
+
+    request — функция без аргументов, выполняющая один запрос
+    к странице; before вызывается перед каждым повтором, например
+    для сброса кеша. Пик памяти снимается отдельным прогоном, чтобы
+    tracemalloc не искажал замер времени.
+    """
+    before = before or (lambda: None)
+    for _ in range(warmup):
+        before()
+        request()
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        before()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(context.captured_queries))
+    before()
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.stop()
+    tracemalloc.start()
+    request()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if tracing:
+        tracemalloc.start()
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'queries': queries,
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, tolerance=0.5, memory_tolerance=0.25):
+    """Возвращает список регрессий относительно сохранённого baseline.
+
+    Число запросов сравнивается строго, время и память — с допуском
+    и небольшим абсолютным запасом, поскольку зависят от машины.
+    Для времени берётся p50: p95 на коротких прогонах слишком шумный.
+    Сравниваются только размеры данных и сценарии из обоих наборов.
+    """
+    regressions = []
+    for size, scenarios in results.items():
+        for name, current in scenarios.items():
+            expected = baseline.get(size, {}).get(name)
+            if expected is None:
+                continue
+            checks = (
+                ('queries', 0, 0),
+                ('p50_ms', tolerance, 5),
+                ('peak_kb', memory_tolerance, 64),
+            )
+            for metric, allowed, slack in checks:
+                limit = expected[metric] * (1 + allowed) + slack
+                if current[metric] > limit:
+                    regressions.append(
+                        f'{name} @ {size}: {metric} {current[metric]} '
+                        f'> {expected[metric]} (+{allowed:.0%})'
+                    )
+    return regressions
+
+
+def load(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def dump(data, path):
+    with open(path, 'w', encoding='utf-8') as target:
+        json.dump(data, target, indent=2, sort_keys=True)
+        target.write('\n')
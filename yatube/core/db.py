@@ -0,0 +1,50 @@
+import sqlite3
+
+from django.conf import settings
+from django.db import connections
+
+
+def pragma_statements(pragmas):
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Обработчик connection_created: PRAGMA из SQLITE_PRAGMAS или из
+    одноимённого ключа настроек конкретной БД в DATABASES.
+
+    journal_mode=WAL сохраняется в файле БД, остальные настройки
+    действуют только на текущее соединение, поэтому применяются
+    к каждому новому.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict.get(
+        'SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS
+    )
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(pragmas):
+            cursor.execute(statement)
+
+
+def is_usable(connection):
+    """is_usable() SQLite-бэкенда Django 2.2 всегда возвращает True,
+    поэтому соединение с SQLite проверяется настоящим SELECT 1.
+    """
+    if connection.vendor != 'sqlite':
+        return connection.is_usable()
+    try:
+        connection.connection.execute('SELECT 1')
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def check_connections(**kwargs):
+    """Обработчик request_started: закрывает постоянные соединения,
+    которые перестали отвечать, чтобы запрос открыл новое.
+
+    Django 2.2 проверяет соединение только после ошибки в нём.
+    """
+    for connection in connections.all():
+        if connection.connection is not None and not is_usable(connection):
+            connection.close()
@@ -0,0 +1,117 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils import timezone
+
+from . import metrics
+from .models import OutboxEmail
+
+logger = logging.getLogger('yatube.mail')
+
+
+class OutboxBackend(BaseEmailBackend):
+    """EMAIL_BACKEND, который только ставит письма в очередь.
+
+    Письма сохраняются в OutboxEmail в той же транзакции, что и
+    запрос, и доставляются командой send_outbox через
+    OUTBOX_EMAIL_BACKEND. Медленный или недоступный почтовый сервер
+    больше не задерживает ответ.
+    """
+
+    def send_messages(self, email_messages):
+        emails = [
+            OutboxEmail.from_message(message)
+            for message in email_messages if message.recipients()
+        ]
+        OutboxEmail.objects.bulk_create(emails)
+        if emails:
+            metrics.registry.inc(
+                'yatube_outbox_emails_total', {'result': 'queued'},
+                len(emails),
+            )
+        return len(emails)
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return min(
+        settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.OUTBOX_MAX_RETRY_DELAY,
+    )
+
+
+def postpone(email, error):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.failed = True
+        result = 'failed'
+        logger.error('Письмо %s не доставлено: %s', email.pk, error)
+    else:
+        email.next_attempt = timezone.now() + timedelta(
+            seconds=retry_delay(email.attempts)
+        )
+        result = 'retry'
+    email.save(update_fields=[
+        'attempts', 'last_error', 'failed', 'next_attempt'
+    ])
+    metrics.registry.inc('yatube_outbox_emails_total', {'result': result})
+
+
+def deliver(batch_size):
+    """Отправляет до batch_size писем, срок которых подошёл, через одно
+    соединение. Возвращает (отправлено, отложено).
+
+    Рассчитано на один процесс send_outbox: строки не блокируются.
+    """
+    emails = list(
+        OutboxEmail.objects.filter(
+            failed=False, next_attempt__lte=timezone.now()
+        ).order_by('next_attempt', 'id')[:batch_size]
+    )
+    if not emails:
+        return 0, 0
+    sent = []
+    connection = get_connection(settings.OUTBOX_EMAIL_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            postpone(email, error)
+        return 0, len(emails)
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([email.load()])
+            except Exception as error:
+                postpone(email, error)
+            else:
+                sent.append(email.pk)
+    finally:
+        connection.close()
+    OutboxEmail.objects.filter(pk__in=sent).delete()
+    if sent:
+        metrics.registry.inc(
+            'yatube_outbox_emails_total', {'result': 'sent'}, len(sent)
+        )
+    return len(sent), len(emails) - len(sent)
+
+
+def queue_depth():
+    """Значения метрик очереди для /metrics/."""
+    pending = OutboxEmail.objects.filter(failed=False)
+    oldest = pending.order_by('created').values_list(
+        'created', flat=True
+    ).first()
+    return {
+        'yatube_outbox_depth{state="pending"}': pending.count(),
+        'yatube_outbox_depth{state="failed"}': (
+            OutboxEmail.objects.filter(failed=True).count()
+        ),
+        'yatube_outbox_oldest_seconds': (
+            (timezone.now() - oldest).total_seconds() if oldest else 0
+        ),
+    }
@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from core.benchmarks import percentile
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# Настройки SQLite по умолчанию, как до core.db.configure_sqlite.
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+def read(alias):
+    """Чтения первой страницы ленты: счётчик и посты с авторами."""
+    posts = Post.objects.using(alias)
+    posts.count()
+    list(posts.select_related('author', 'group')[:settings.PAGE_COUNT])
+
+
+def write(alias, author_id):
+    with transaction.atomic(using=alias):
+        Post.objects.using(alias).create(
+            author_id=author_id, text='Новый пост ' * 20
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность конкурентных чтений и записей '
+        'SQLite с настройками по умолчанию и с SQLITE_PRAGMAS. Запросы '
+        'идут через соединения Django к таблицам моделей проекта, так что '
+        'PRAGMA применяет core.db.configure_sqlite, как в работе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Бенчмарк рассчитан только на SQLite')
+        directory = tempfile.mkdtemp()
+        try:
+            for mode, pragmas in (
+                ('default', DEFAULT_PRAGMAS),
+                ('tuned', settings.SQLITE_PRAGMAS),
+            ):
+                alias = f'bench_{mode}'
+                connections.databases[alias] = dict(
+                    connections.databases['default'],
+                    NAME=os.path.join(directory, f'{mode}.sqlite3'),
+                    SQLITE_PRAGMAS=pragmas,
+                )
+                try:
+                    author_id = self.prepare(alias, options['rows'])
+                    result = self.run(alias, author_id, options)
+                finally:
+                    connections[alias].close()
+                    del connections.databases[alias]
+                self.stdout.write(
+                    f'{mode:<8} чтений/с {result["reads"]:>8.0f}  '
+                    f'записей/с {result["writes"]:>7.0f}  '
+                    f'p95 чтения {result["read_p95"]:>7.2f} мс  '
+                    f'p95 записи {result["write_p95"]:>7.2f} мс  '
+                    f'ошибок блокировки {result["errors"]}'
+                )
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def prepare(self, alias, rows):
+        """Создаёт таблицы пользователей, групп и постов и заполняет их."""
+        with connections[alias].schema_editor() as editor:
+            for model in (User, Group, Post):
+                editor.create_model(model)
+        author = User.objects.db_manager(alias).create(username='bench')
+        Post.objects.using(alias).bulk_create(
+            (
+                Post(author=author, text=f'Пост {number} ' * 20)
+                for number in range(rows)
+            ),
+            batch_size=500,
+        )
+        return author.id
+
+    def run(self, alias, author_id, options):
+        deadline = time.monotonic() + options['seconds']
+        timings = {'read': [], 'write': []}
+        errors = []
+        lock = threading.Lock()
+
+        def worker(kind):
+            local = []
+            failures = 0
+            try:
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        if kind == 'read':
+                            read(alias)
+                        else:
+                            write(alias, author_id)
+                    except OperationalError:
+                        failures += 1
+                        continue
+                    local.append((time.perf_counter() - started) * 1000)
+            finally:
+                connections[alias].close()
+            with lock:
+                timings[kind].extend(local)
+                errors.append(failures)
+
+        threads = [
+            threading.Thread(target=worker, args=('read',))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=('write',))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = options['seconds']
+        return {
+            'reads': len(timings['read']) / seconds,
+            'writes': len(timings['write']) / seconds,
+            'read_p95': percentile(timings['read'] or [0], 0.95),
+            'write_p95': percentile(timings['write'] or [0], 0.95),
+            'errors': sum(errors),
+        }
@@ -0,0 +1,168 @@
+import os
+import platform
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core import benchmarks
+from posts.models import Group, Post
+
+User = get_user_model()
+
+BENCHMARK_DIR = os.path.join(settings.BASE_DIR, 'benchmarks')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет p50/p95, число запросов и пик памяти основных страниц '
+        'на тестовой БД нескольких размеров и сравнивает с baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000,100000',
+            help='Число постов в наборах данных через запятую',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            default=os.path.join(BENCHMARK_DIR, 'results.json'),
+        )
+        parser.add_argument(
+            '--baseline',
+            default=os.path.join(BENCHMARK_DIR, 'baseline.json'),
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Сохранить результаты как новый baseline',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help='Допустимый рост p50 относительно baseline',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        self.repeat = options['repeat']
+        media_root = tempfile.mkdtemp()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            with override_settings(MEDIA_ROOT=media_root):
+                results = self.run_sizes(sizes, options['seed'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(media_root, ignore_errors=True)
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'repeat': self.repeat,
+                'seed': options['seed'],
+            },
+            'results': results,
+        }
+        os.makedirs(os.path.dirname(options['output']), exist_ok=True)
+        benchmarks.dump(report, options['output'])
+        if options['update_baseline']:
+            benchmarks.dump(report, options['baseline'])
+            self.stdout.write(self.style.SUCCESS('Baseline обновлён'))
+            return
+        if not os.path.exists(options['baseline']):
+            self.stdout.write('Baseline не найден, сравнение пропущено')
+            return
+        regressions = benchmarks.compare(
+            results,
+            benchmarks.load(options['baseline'])['results'],
+            options['tolerance'],
+        )
+        if regressions:
+            raise CommandError(
+                'Регрессии производительности:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    def run_sizes(self, sizes, seed):
+        results = {}
+        for size in sizes:
+            call_command('flush', interactive=False, verbosity=0)
+            call_command(
+                'generate_dataset',
+                users=max(size // 50, 20),
+                groups=max(size // 1000, 5),
+                posts=size,
+                comments=size,
+                follows=max(size // 10, 20),
+                seed=seed,
+                stdout=StringIO(),
+            )
+            results[str(size)] = self.run_scenarios()
+            for name, metrics in results[str(size)].items():
+                self.stdout.write(f'{size:>8} {name:<14} ' + ' '.join(
+                    f'{key}={value}' for key, value in sorted(metrics.items())
+                ))
+        return results
+
+    def run_scenarios(self):
+        group = Group.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        author = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        post = Post.objects.annotate(
+            total=Count('comments')
+        ).order_by('-total').first()
+        follower = User.objects.annotate(
+            total=Count('follower')
+        ).order_by('-total').first()
+        guest = Client()
+        client = Client()
+        client.force_login(follower)
+        scenarios = {
+            'index': (guest, 'get', reverse('posts:index')),
+            'group_list': (
+                guest, 'get', reverse('posts:group_list', args=(group.slug,))
+            ),
+            'profile': (
+                guest, 'get', reverse('posts:profile', args=(author.username,))
+            ),
+            'post_detail': (
+                guest, 'get', reverse('posts:post_detail', args=(post.id,))
+            ),
+            'follow_index': (client, 'get', reverse('posts:follow_index')),
+            'post_create': (client, 'post', reverse('posts:post_create')),
+        }
+        return {
+            name: benchmarks.measure(
+                self.requester(*scenario),
+                repeat=self.repeat,
+                before=cache.clear,
+            )
+            for name, scenario in scenarios.items()
+        }
+
+    def requester(self, client, method, url):
+        data = {'text': 'Замер'} if method == 'post' else None
+
+        def request():
+            response = getattr(client, method)(url, data)
+            if response.status_code >= 400:
+                raise CommandError(f'{url}: HTTP {response.status_code}')
+        return request
@@ -0,0 +1,95 @@
+import os
+import re
+import subprocess
+import sys
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Строка вывода python -X importtime:
+# import time:       self [us] |  cumulative | imported package
+LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+Import = namedtuple('Import', 'module self_us cumulative_us depth')
+
+TARGETS = {
+    'wsgi': ['-c', 'import yatube.wsgi'],
+    'manage': ['manage.py', 'check'],
+}
+
+
+def parse(output):
+    imports = []
+    for line in output.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append(Import(
+                module, int(self_us), int(cumulative_us),
+                (len(indent) - 1) // 2,
+            ))
+    return imports
+
+
+def package(module):
+    return module.split('.', 1)[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Профиль импорта при запуске: python -X importtime для WSGI или '
+        'manage.py, самые дорогие модули и пакеты верхнего уровня.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', choices=sorted(TARGETS), default='wsgi'
+        )
+        parser.add_argument(
+            '--sort', choices=('self', 'cumulative'), default='cumulative'
+        )
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument(
+            '--warmup',
+            action='store_true',
+            help='Не отключать прогрев core.warmup при загрузке wsgi',
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='yatube.settings')
+        if not options['warmup']:
+            env['YATUBE_WARMUP'] = '0'
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', *TARGETS[options['target']]],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr[-2000:])
+        imports = parse(result.stderr)
+        total = sum(item.cumulative_us for item in imports if not item.depth)
+        self.stdout.write(
+            f'{options["target"]}: {len(imports)} модулей, '
+            f'импорт {total / 1000:.1f} мс'
+        )
+        key = 'self_us' if options['sort'] == 'self' else 'cumulative_us'
+        self.stdout.write('\nМодули:')
+        for item in sorted(
+            imports, key=lambda item: getattr(item, key), reverse=True
+        )[:options['top']]:
+            self.stdout.write(
+                f'{item.cumulative_us / 1000:>9.1f} мс  '
+                f'{item.self_us / 1000:>8.1f} мс  {item.module}'
+            )
+        packages = {}
+        for item in imports:
+            name = package(item.module)
+            packages[name] = packages.get(name, 0) + item.self_us
+        self.stdout.write('\nСобственное время по пакетам:')
+        for name, self_us in sorted(
+            packages.items(), key=lambda item: item[1], reverse=True
+        )[:options['top']]:
+            self.stdout.write(f'{self_us / 1000:>9.1f} мс  {name}')
@@ -0,0 +1,62 @@
+import json
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала памяти по представлениям: пик выделений, '
+        'число запросов сверх бюджета и главные места выделения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.MEMORY_LOG)
+        parser.add_argument(
+            '--view', help='Только одно представление, например posts:index'
+        )
+        parser.add_argument('--top', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['log'], encoding='utf-8') as source:
+                views = self.load(source, options['view'])
+        except FileNotFoundError:
+            raise CommandError(f'Журнал {options["log"]} не найден')
+        if not views:
+            self.stdout.write('Записей нет')
+            return
+        ordered = sorted(
+            views.items(),
+            key=lambda item: max(entry['peak_kb'] for entry in item[1]),
+            reverse=True,
+        )
+        for view, entries in ordered:
+            peaks = [entry['peak_kb'] for entry in entries]
+            over_budget = sum(entry['over_budget'] for entry in entries)
+            self.stdout.write(
+                f'{view}: {len(entries)} запросов, пик p50 '
+                f'{percentile(peaks, 0.5):.0f} КБ, p95 '
+                f'{percentile(peaks, 0.95):.0f} КБ, максимум '
+                f'{max(peaks):.0f} КБ, сверх бюджета {over_budget}'
+            )
+            sites = Counter()
+            for entry in entries:
+                for site in entry['top']:
+                    sites[site['site']] += site['size_kb']
+            for site, size_kb in sites.most_common(options['top']):
+                self.stdout.write(f'   {size_kb:.1f} КБ  {site}')
+
+    def load(self, lines, only_view):
+        views = defaultdict(list)
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if only_view in (None, entry['view']):
+                views[entry['view']].append(entry)
+        return views
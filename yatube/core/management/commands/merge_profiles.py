@@ -0,0 +1,70 @@
+import glob
+import os
+import pstats
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводит профили запросов в один файл свёрнутых стеков для '
+        'flamegraph.pl/speedscope и, по желанию, в общий файл pstats.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=settings.PROFILING_DIR)
+        parser.add_argument(
+            '--view',
+            action='append',
+            default=[],
+            help='Имя URL, например posts:index; можно несколько раз',
+        )
+        parser.add_argument(
+            '--output', help='Файл свёрнутых стеков, по умолчанию stdout'
+        )
+        parser.add_argument('--pstats', help='Файл для общего pstats')
+
+    def handle(self, *args, **options):
+        directories = [
+            view.replace(':', '_') for view in options['view']
+        ] or ['*']
+        stems = sorted(
+            path[:-len('.folded')]
+            for directory in directories
+            for path in glob.glob(
+                os.path.join(options['dir'], directory, '*.folded')
+            )
+        )
+        if not stems:
+            raise CommandError('Профили не найдены')
+        stacks = Counter()
+        for stem in stems:
+            with open(stem + '.folded', encoding='utf-8') as source:
+                for line in source:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack:
+                        stacks[stack] += int(count)
+        target = self.stdout
+        if options['output']:
+            target = open(options['output'], 'w', encoding='utf-8')
+        try:
+            for stack, count in sorted(stacks.items()):
+                target.write(f'{stack} {count}\n')
+        finally:
+            if options['output']:
+                target.close()
+        if options['pstats']:
+            # pstats есть только у запросов с заголовком X-Profile.
+            profiles = [
+                stem + '.prof' for stem in stems
+                if os.path.exists(stem + '.prof')
+            ]
+            if not profiles:
+                raise CommandError('Профили pstats не найдены')
+            stats = pstats.Stats(*profiles)
+            stats.dump_stats(options['pstats'])
+        self.stderr.write(
+            f'Сведено профилей: {len(stems)}, стеков: {len(stacks)}'
+        )
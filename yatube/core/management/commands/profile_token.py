@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = (
+        'Выдаёт значение заголовка X-Profile, с которым запрос будет '
+        'профилирован независимо от PROFILING_EVERY.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import deliver
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди OutboxEmail пакетами через '
+        'OUTBOX_EMAIL_BACKEND. Запускается в одном экземпляре.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = postponed = 0
+            while True:
+                batch_sent, batch_postponed = deliver(options['batch_size'])
+                sent += batch_sent
+                postponed += batch_postponed
+                if batch_sent + batch_postponed < options['batch_size']:
+                    break
+            if sent or postponed or not options['loop']:
+                self.stdout.write(
+                    f'Отправлено {sent}, отложено {postponed}'
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
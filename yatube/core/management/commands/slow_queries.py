@@ -0,0 +1,85 @@
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала медленных запросов: самые затратные запросы по '
+        'суммарному времени с учётом подавленных повторов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.SLOW_QUERY_LOG)
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--order',
+            choices=('total', 'count', 'max'),
+            default='total',
+            help='Сортировка: суммарное время, число запросов или максимум',
+        )
+        parser.add_argument(
+            '--plans', action='store_true', help='Показать планы запросов'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['log'], encoding='utf-8') as source:
+                queries = self.aggregate(source)
+        except FileNotFoundError:
+            raise CommandError(f'Журнал {options["log"]} не найден')
+        if not queries:
+            self.stdout.write('Медленных запросов нет')
+            return
+        key = {
+            'total': lambda query: query['total_ms'],
+            'count': lambda query: query['count'],
+            'max': lambda query: query['max_ms'],
+        }[options['order']]
+        top = sorted(queries.values(), key=key, reverse=True)
+        for number, query in enumerate(top[:options['top']], 1):
+            views = ', '.join(
+                f'{view} ({count})'
+                for view, count in query['views'].most_common(3)
+            )
+            self.stdout.write(
+                f'{number}. [{query["fingerprint"]}] '
+                f'{query["count"]} раз, всего {query["total_ms"]:.1f} мс, '
+                f'среднее {query["total_ms"] / query["count"]:.1f} мс, '
+                f'максимум {query["max_ms"]:.1f} мс'
+            )
+            self.stdout.write(f'   {query["sql"][:300]}')
+            self.stdout.write(f'   представления: {views}')
+            if query['stack']:
+                self.stdout.write(f'   вызов: {query["stack"][-1]}')
+            if options['plans']:
+                for line in query['plan']:
+                    self.stdout.write(f'   план: {line}')
+
+    def aggregate(self, lines):
+        queries = {}
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            query = queries.setdefault(entry['fingerprint'], {
+                'fingerprint': entry['fingerprint'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'views': Counter(),
+            })
+            query['count'] += 1 + entry['suppressed']
+            query['total_ms'] += entry['duration_ms'] + entry['suppressed_ms']
+            query['views'][entry['view']] += 1
+            if entry['duration_ms'] >= query['max_ms']:
+                query.update(
+                    max_ms=entry['duration_ms'],
+                    sql=entry['sql'],
+                    stack=entry['stack'],
+                    plan=entry['plan'],
+                )
+        return queries
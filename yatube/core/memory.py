@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+logger = logging.getLogger('yatube.memory')
+
+FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def site_name(frame):
+    path = frame.filename
+    if path.startswith(settings.BASE_DIR):
+        path = os.path.relpath(path, settings.BASE_DIR)
+    elif 'site-packages' in path:
+        path = path.split('site-packages' + os.sep, 1)[1]
+    return f'{path}:{frame.lineno}'
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(FILTERS)
+
+
+def max_rss_kb():
+    """Пиковый RSS процесса; модуль resource есть только в Unix."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class RequestAllocations:
+    """Пик и прирост выделенной памяти за время запроса.
+
+    Счётчики tracemalloc общие для процесса, поэтому при нескольких
+    потоках в воркере цифры запросов смешиваются: режим рассчитан на
+    воркеры с одним потоком.
+    """
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_FRAMES)
+        if hasattr(tracemalloc, 'reset_peak'):
+            self.before = take_snapshot()
+            tracemalloc.reset_peak()
+        else:
+            # До Python 3.9 пик сбрасывается только перезапуском
+            # трассировки; старые выделения при этом забываются.
+            tracemalloc.stop()
+            tracemalloc.start(settings.MEMORY_FRAMES)
+            self.before = take_snapshot()
+        self.base = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc_info):
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = peak - self.base
+        self.retained = current - self.base
+        self.after = take_snapshot()
+
+    def top_sites(self, limit):
+        """Места, где за запрос выросла занятая память, по убыванию."""
+        statistics = self.after.compare_to(self.before, 'lineno')
+        return [
+            {
+                'site': site_name(statistic.traceback[0]),
+                'size_kb': round(statistic.size_diff / 1024, 1),
+                'count': statistic.count_diff,
+            }
+            for statistic in statistics
+            if statistic.size_diff > 0
+        ][:limit]
+
+
+def record(request, response, allocations):
+    """Пишет строку в журнал памяти и предупреждает о превышении."""
+    match = request.resolver_match
+    peak_kb = round(allocations.peak / 1024, 1)
+    entry = {
+        'time': datetime.now(timezone.utc).isoformat(),
+        'view': match.view_name if match else 'unresolved',
+        'path': request.path,
+        'status': response.status_code,
+        'peak_kb': peak_kb,
+        'retained_kb': round(allocations.retained / 1024, 1),
+        'max_rss_kb': max_rss_kb(),
+        'over_budget': peak_kb > settings.MEMORY_BUDGET_KB,
+        'top': allocations.top_sites(settings.MEMORY_TOP_SITES),
+        'pid': os.getpid(),
+    }
+    if entry['over_budget']:
+        logger.warning(
+            '%s %s: пик памяти %s КБ при бюджете %s КБ',
+            entry['view'], entry['path'], peak_kb, settings.MEMORY_BUDGET_KB,
+        )
+    os.makedirs(os.path.dirname(settings.MEMORY_LOG), exist_ok=True)
+    with open(settings.MEMORY_LOG, 'a', encoding='utf-8') as target:
+        target.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    return entry
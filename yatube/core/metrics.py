@@ -0,0 +1,359 @@
+import glob
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+HISTOGRAM = 'histogram'
+COUNTER = 'counter'
+GAUGE = 'gauge'
+
+FAMILIES = {
+    'yatube_request_duration_seconds': (
+        HISTOGRAM, 'Длительность обработки запроса по имени URL'
+    ),
+    'yatube_db_queries_total': (COUNTER, 'Число SQL-запросов по имени URL'),
+    'yatube_cache_requests_total': (
+        COUNTER, 'Обращения к кешу страниц и фрагментов шаблонов'
+    ),
+    'yatube_thumbnail_duration_seconds': (
+        HISTOGRAM, 'Время генерации миниатюр sorl-thumbnail'
+    ),
+    'yatube_outbox_emails_total': (
+        COUNTER, 'Письма очереди: поставлены, отправлены, отложены, сброшены'
+    ),
+    'yatube_outbox_depth': (GAUGE, 'Писем в очереди на отправку'),
+    'yatube_outbox_oldest_seconds': (
+        GAUGE, 'Возраст самого старого неотправленного письма'
+    ),
+}
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+LABELLED_NAMESPACES = ('posts', 'users', 'about')
+
+FRAGMENT_PREFIX = 'template.cache.'
+
+INITIAL_SIZE = 64 * 1024
+
+_HEADER = struct.Struct('i4x')
+_LENGTH = struct.Struct('i')
+_VALUE = struct.Struct('d')
+
+METRICS_FILE = re.compile(r'metrics_(\d+)\.db$')
+
+_local = threading.local()
+
+
+def read_entries(data):
+    """Разбирает содержимое файла метрик: (ключ, значение, смещение)."""
+    used = _HEADER.unpack_from(data, 0)[0] if len(data) >= 8 else 0
+    position = _HEADER.size
+    while position < used:
+        length = _LENGTH.unpack_from(data, position)[0]
+        padded = length + (-(length + _LENGTH.size) % 8)
+        key = bytes(
+            data[position + _LENGTH.size:position + _LENGTH.size + length]
+        ).decode()
+        value_position = position + _LENGTH.size + padded
+        yield key, _VALUE.unpack_from(data, value_position)[0], value_position
+        position = value_position + _VALUE.size
+
+
+class MmapDict:
+    """Словарь строка → float в файле, отображённом в память.
+
+    Пишет в файл только процесс-владелец, читать его могут любые
+    процессы: новая запись сначала заполняется целиком, и лишь потом
+    увеличивается счётчик занятых байт в заголовке. Значения
+    выровнены по 8 байт, поэтому читатель не увидит половину числа.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < INITIAL_SIZE:
+            self._file.truncate(INITIAL_SIZE)
+            size = INITIAL_SIZE
+        self._capacity = size
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._positions = {}
+        self._used = _HEADER.size
+        for key, _, position in read_entries(self._map):
+            self._positions[key] = position
+            self._used = position + _VALUE.size
+
+    def inc(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        value = _VALUE.unpack_from(self._map, position)[0]
+        _VALUE.pack_into(self._map, position, value + amount)
+
+    def _append(self, key):
+        encoded = key.encode()
+        padded = len(encoded) + (-(len(encoded) + _LENGTH.size) % 8)
+        size = _LENGTH.size + padded + _VALUE.size
+        if self._used + size > self._capacity:
+            self._grow(self._used + size)
+        _LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[
+            self._used + _LENGTH.size:self._used + _LENGTH.size + len(encoded)
+        ] = encoded
+        position = self._used + _LENGTH.size + padded
+        _VALUE.pack_into(self._map, position, 0.0)
+        self._positions[key] = position
+        self._used = position + _VALUE.size
+        _HEADER.pack_into(self._map, 0, self._used)
+        return position
+
+    def _grow(self, required):
+        while self._capacity < required:
+            self._capacity *= 2
+        self._map.close()
+        self._file.truncate(self._capacity)
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def pid_alive(pid):
+    """Жив ли процесс pid. Вне POSIX проверить нельзя (os.kill там
+    завершает процесс), и процесс считается живым.
+    """
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def absorb_dead(values, directory):
+    """Переносит в values счётчики завершившихся воркеров и удаляет
+    их файлы, чтобы METRICS_DIR не рос с каждым перезапуском.
+
+    Файл сначала переименовывается: rename атомарен, поэтому чужой
+    файл заберёт только один из одновременно стартующих воркеров.
+    """
+    for path in glob.glob(os.path.join(directory, 'metrics_*.db')):
+        match = METRICS_FILE.search(path)
+        if match is None or pid_alive(int(match.group(1))):
+            continue
+        claimed = f'{path}.{os.getpid()}.merging'
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            continue
+        with open(claimed, 'rb') as source:
+            data = source.read()
+        for key, value, _ in read_entries(data):
+            values.inc(key, value)
+        os.remove(claimed)
+
+
+class Registry:
+    """Метрики текущего процесса в файле metrics_<pid>.db.
+
+    После fork процесс-наследник заводит собственный файл, так что
+    каждый воркер пишет только в свой, и забирает себе счётчики
+    завершившихся воркеров (absorb_dead).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owner = None
+        self._values = None
+
+    def _storage(self):
+        owner = (os.getpid(), settings.METRICS_DIR)
+        if owner != self._owner:
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            self._values = MmapDict(os.path.join(
+                settings.METRICS_DIR, f'metrics_{owner[0]}.db'
+            ))
+            self._owner = owner
+            absorb_dead(self._values, settings.METRICS_DIR)
+        return self._values
+
+    def inc(self, name, labels, amount=1):
+        key = sample_key(name, labels)
+        with self._lock:
+            self._storage().inc(key, amount)
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            storage = self._storage()
+            for bound in buckets:
+                if value <= bound:
+                    storage.inc(sample_key(
+                        f'{name}_bucket', dict(labels, le=str(bound))
+                    ), 1)
+            storage.inc(sample_key(
+                f'{name}_bucket', dict(labels, le='+Inf')
+            ), 1)
+            storage.inc(sample_key(f'{name}_sum', labels), value)
+            storage.inc(sample_key(f'{name}_count', labels), 1)
+
+
+registry = Registry()
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def sample_key(name, labels):
+    if not labels:
+        return name
+    return name + '{' + ','.join(
+        f'{label}="{escape(value)}"' for label, value in sorted(labels.items())
+    ) + '}'
+
+
+LE_LABEL = re.compile(r',?le="([^"]*)"')
+
+
+def sample_order(sample):
+    """Ключ сортировки: корзины гистограммы идут по возрастанию le."""
+    key = sample[0]
+    match = LE_LABEL.search(key)
+    if match is None:
+        return key, 0.0
+    return LE_LABEL.sub('', key, count=1), float(match.group(1))
+
+
+# Функции без аргументов, возвращающие {ключ метрики: значение};
+# вызываются при каждом чтении /metrics/ (см. CoreConfig.ready).
+gauges = []
+
+
+def collect():
+    """Суммирует значения из файлов всех процессов и добавляет
+    текущие значения gauges.
+    """
+    totals = defaultdict(float)
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics_*.db')):
+        with open(path, 'rb') as source:
+            data = source.read()
+        for key, value, _ in read_entries(data):
+            totals[key] += value
+    for gauge in gauges:
+        totals.update(gauge())
+    return totals
+
+
+def render():
+    """Метрики всех процессов в текстовом формате Prometheus."""
+    families = defaultdict(list)
+    for key, value in collect().items():
+        family = key.split('{', 1)[0]
+        for suffix in ('_bucket', '_sum', '_count'):
+            if family.endswith(suffix) and family[:-len(suffix)] in FAMILIES:
+                family = family[:-len(suffix)]
+        families[family].append((key, value))
+    lines = []
+    for family, samples in sorted(families.items()):
+        kind, description = FAMILIES.get(family, ('untyped', ''))
+        lines.append(f'# HELP {family} {description}')
+        lines.append(f'# TYPE {family} {kind}')
+        lines.extend(
+            f'{key} {value!r}'
+            for key, value in sorted(samples, key=sample_order)
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def view_label(request):
+    """Имя URL для метки view; прочие адреса сводятся к other."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    if match.namespace in LABELLED_NAMESPACES and match.url_name:
+        return match.view_name
+    return 'other'
+
+
+def current_view():
+    return getattr(_local, 'view', 'unresolved')
+
+
+def set_current_view(view):
+    _local.view = view
+
+
+def record_page_cache(request, view):
+    """Учитывает попадание в кеш cache_page по флагу CacheMiddleware."""
+    update_cache = getattr(request, '_cache_update_cache', None)
+    if update_cache is None or request.method not in ('GET', 'HEAD'):
+        return
+    registry.inc('yatube_cache_requests_total', {
+        'cache': 'page',
+        'view': view,
+        'result': 'miss' if update_cache else 'hit',
+    })
+
+
+def install():
+    """Подключает учёт фрагментов шаблонов и генерации миниатюр."""
+    from sorl.thumbnail.base import ThumbnailBackend
+
+    def fragment_get(get):
+        if getattr(get, 'counts_fragments', False):
+            return get
+
+        @wraps(get)
+        def wrapper(self, key, *args, **kwargs):
+            value = get(self, key, *args, **kwargs)
+            if isinstance(key, str) and key.startswith(FRAGMENT_PREFIX):
+                registry.inc('yatube_cache_requests_total', {
+                    'cache': 'fragment',
+                    'view': current_view(),
+                    'result': 'miss' if value is None else 'hit',
+                })
+            return value
+        wrapper.counts_fragments = True
+        return wrapper
+
+    def thumbnail_timer(create):
+        if getattr(create, 'observed', False):
+            return create
+
+        @wraps(create)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return create(*args, **kwargs)
+            finally:
+                registry.observe(
+                    'yatube_thumbnail_duration_seconds',
+                    {'view': current_view()},
+                    time.perf_counter() - started,
+                )
+        wrapper.observed = True
+        return wrapper
+
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        backend.get = fragment_get(backend.get)
+    ThumbnailBackend._create_thumbnail = thumbnail_timer(
+        ThumbnailBackend._create_thumbnail
+    )
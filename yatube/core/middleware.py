@@ -0,0 +1,188 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import memory, metrics, profiling, routers, timing
+
+logger = logging.getLogger('yatube.timing')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+PRIMARY_UNTIL = '_db_primary_until'
+
+
+def pinned_to_primary(request):
+    """Сессия недавно что-то изменила и читает только из основной БД."""
+    session = getattr(request, 'session', None)
+    return (
+        session is not None
+        and session.get(PRIMARY_UNTIL, 0) >= time.time()
+    )
+
+
+class ServerTimingMiddleware:
+    """Замеряет время запроса в БД, шаблонах, миниатюрах и кеше.
+
+    Для доли запросов SERVER_TIMING_SAMPLE_RATE добавляет заголовок
+    Server-Timing и пишет строку JSON в лог yatube.timing. Остальные
+    запросы обрабатываются без замеров. Ставится сразу после
+    MetricsMiddleware, до сессий и аутентификации, чтобы учитывать их
+    запросы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        timings = timing.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.database)
+                    )
+                response = self.get_response(request)
+        finally:
+            timing.stop()
+        response['Server-Timing'] = timings.header()
+        logger.info(json.dumps(dict(
+            timings.as_dict(),
+            method=request.method,
+            path=request.path,
+            view=getattr(request.resolver_match, 'view_name', None),
+            status=response.status_code,
+        ), ensure_ascii=False))
+        return response
+
+
+class MetricsMiddleware:
+    """Собирает гистограммы задержек, число SQL-запросов и попадания
+    в кеш страниц с меткой по имени URL.
+
+    Значения пишутся в файл текущего процесса (core.metrics), их сумму
+    по всем воркерам отдаёт адрес /metrics/.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(count))
+                response = self.get_response(request)
+        finally:
+            metrics.set_current_view('unresolved')
+        view = metrics.view_label(request)
+        labels = {'view': view}
+        metrics.registry.observe(
+            'yatube_request_duration_seconds',
+            labels,
+            time.perf_counter() - started,
+        )
+        if queries:
+            metrics.registry.inc('yatube_db_queries_total', labels, queries)
+        metrics.record_page_cache(request, view)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics.set_current_view(metrics.view_label(request))
+
+
+class ProfilingMiddleware:
+    """Профилирует каждый PROFILING_EVERY-й запрос семплером стеков,
+    а запросы с подписанным заголовком X-Profile — ещё и cProfile.
+
+    Профили складываются в PROFILING_DIR по имени URL; имя профиля
+    возвращается в заголовке X-Profile. Свести их в один файл для
+    flamegraph можно командой merge_profiles.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = profiling.profile_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        with profiling.RequestProfile(mode) as profile:
+            response = self.get_response(request)
+        match = request.resolver_match
+        response['X-Profile'] = profile.save(
+            match.view_name if match else 'unresolved'
+        )
+        return response
+
+
+class MemoryMiddleware:
+    """Диагностика памяти: при MEMORY_TRACKING пишет для каждого
+    запроса пик выделений, прирост и главные места выделения.
+
+    Запросы с пиком выше MEMORY_BUDGET_KB помечаются и попадают
+    в лог yatube.memory; сводку строит команда memory_report.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.MEMORY_TRACKING:
+            return self.get_response(request)
+        with memory.RequestAllocations() as allocations:
+            response = self.get_response(request)
+        memory.record(request, response, allocations)
+        return response
+
+
+class ReplicaMiddleware:
+    """Отдаёт чтения представлений из REPLICA_VIEWS репликам.
+
+    После успешного изменяющего запроса сессия на
+    REPLICA_STICKY_SECONDS закрепляется за основной БД, чтобы
+    пользователь сразу видел свои изменения. Ставится последним
+    в MIDDLEWARE: сессия к этому моменту уже загружена из default.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.use_primary()
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and hasattr(request, 'session')
+        ):
+            request.session[PRIMARY_UNTIL] = (
+                time.time() + settings.REPLICA_STICKY_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and not pinned_to_primary(request)
+        ):
+            routers.use_replica()
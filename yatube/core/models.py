@@ -0,0 +1,51 @@
+import pickle
+
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEmail(models.Model):
+    """Письмо в очереди на отправку командой send_outbox."""
+
+    message = models.BinaryField(verbose_name='Письмо')
+    subject = models.CharField('Тема', max_length=255)
+    recipients = models.TextField('Получатели')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    failed = models.BooleanField(
+        'Не доставлено',
+        default=False,
+        help_text='Попытки исчерпаны, письмо больше не отправляется',
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(
+                fields=['failed', 'next_attempt'], name='outbox_due_idx'
+            ),
+        ]
+
+    @classmethod
+    def from_message(cls, message):
+        connection, message.connection = message.connection, None
+        try:
+            payload = pickle.dumps(message)
+        finally:
+            message.connection = connection
+        return cls(
+            message=payload,
+            subject=message.subject[:255],
+            recipients=', '.join(message.recipients()),
+        )
+
+    def load(self):
+        return pickle.loads(self.message)
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipients}'
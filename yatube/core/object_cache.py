@@ -0,0 +1,150 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from . import metrics
+
+NOT_CACHED = object()
+
+
+class LocalLRU:
+    """Ограниченный кеш процесса: последние использованные объекты
+    с коротким сроком жизни.
+
+    Сброс по сигналу виден только своему процессу, поэтому срок жизни
+    OBJECT_CACHE_L1_SECONDS ограничивает, насколько другие воркеры
+    отстают от изменений. Значения хранятся в pickle, и каждый запрос
+    получает свою копию объекта: состояние, которое на него навешивают
+    представления и _state.fields_cache, не делится между потоками.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return NOT_CACHED
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return NOT_CACHED
+            self.entries.move_to_end(key)
+        return pickle.loads(value)
+
+    def set(self, key, value):
+        size = settings.OBJECT_CACHE_L1_SIZE
+        if size <= 0:
+            return
+        expires = time.monotonic() + settings.OBJECT_CACHE_L1_SECONDS
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class ObjectCache:
+    """Чтение объектов модели по уникальному полю через два уровня кеша.
+
+    Сначала LocalLRU процесса, затем общий кеш, затем БД. Отсутствующий
+    объект тоже кешируется (None) на OBJECT_CACHE_MISSING_TIME, чтобы
+    перебор несуществующих адресов не доходил до БД.
+
+    Промах читается с основной БД, а не с реплики: запись сбрасывается
+    сигналом сразу после изменения, и отстающая реплика положила бы
+    в кеш старый объект на всё время хранения.
+    """
+
+    def __init__(self, model, field, name):
+        self.model = model
+        self.field = field
+        self.name = name
+        self.local = LocalLRU()
+
+    def key(self, value):
+        """Ключ по md5 значения: в адресе бывают пробелы, управляющие
+        символы и строки длиннее 250 байт, которые memcached не примет.
+        """
+        digest = md5(str(value).encode()).hexdigest()
+        return f'objects:{self.name}:{digest}'
+
+    def record(self, result):
+        metrics.registry.inc('yatube_cache_requests_total', {
+            'cache': self.name,
+            'view': metrics.current_view(),
+            'result': result,
+        })
+
+    def get(self, value):
+        """Объект с полем field == value или None, если его нет."""
+        key = self.key(value)
+        instance = self.local.get(key)
+        if instance is not NOT_CACHED:
+            self.record('local')
+            return instance
+        instance = cache.get(key, NOT_CACHED)
+        if instance is NOT_CACHED:
+            self.record('miss')
+            instance = self.model._default_manager.using('default').filter(
+                **{self.field: value}
+            ).first()
+            cache.set(key, instance, (
+                settings.OBJECT_CACHE_TIME if instance is not None
+                else settings.OBJECT_CACHE_MISSING_TIME
+            ))
+        else:
+            self.record('hit')
+        self.local.set(key, instance)
+        return instance
+
+    def get_or_404(self, value):
+        instance = self.get(value)
+        if instance is None:
+            raise Http404(
+                f'{self.model._meta.verbose_name} {value} не найден'
+            )
+        return instance
+
+    def forget(self, *values):
+        for value in values:
+            key = self.key(value)
+            self.local.delete(key)
+            cache.delete(key)
+
+    def remember(self, instance, update_fields=None):
+        """Запоминает значение поля в БД до сохранения, чтобы после
+        переименования сбросить и старый ключ.
+        """
+        if instance.pk is None or (
+            update_fields is not None and self.field not in update_fields
+        ):
+            return
+        instance._object_cache_previous = (
+            self.model._default_manager.using('default')
+            .filter(pk=instance.pk)
+            .values_list(self.field, flat=True).first()
+        )
+
+    def changed(self, instance):
+        self.forget(*{
+            getattr(instance, self.field),
+            getattr(instance, '_object_cache_previous', None),
+        } - {None})
@@ -0,0 +1,144 @@
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = 'core.profiling'
+
+HEADER = 'HTTP_X_PROFILE'
+
+# Режимы профилирования: полный — cProfile и частый семплер стеков
+# по подписанному заголовку; выборочный — только редкий семплер,
+# дешёвый для каждого PROFILING_EVERY-го запроса в работе.
+FULL = 'full'
+SAMPLED = 'sampled'
+
+
+def make_token():
+    """Значение заголовка X-Profile, включающего профилирование."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(uuid.uuid4().hex)
+
+
+def has_valid_token(request):
+    token = request.META.get(HEADER)
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def profile_mode(request):
+    """FULL для запроса с подписанным X-Profile, SAMPLED для каждого
+    PROFILING_EVERY-го запроса, None — без профилирования."""
+    if has_valid_token(request):
+        return FULL
+    every = settings.PROFILING_EVERY
+    if every and random.randrange(every) == 0:
+        return SAMPLED
+    return None
+
+
+def frame_name(frame):
+    """Имя кадра для свёрнутого стека: путь от корня проекта или пакета."""
+    path = frame.f_code.co_filename
+    if path.startswith(settings.BASE_DIR):
+        path = os.path.relpath(path, settings.BASE_DIR)
+    elif 'site-packages' in path:
+        path = path.split('site-packages' + os.sep, 1)[1]
+    else:
+        path = os.path.basename(path)
+    return f'{path}:{frame.f_code.co_name}'
+
+
+class StackSampler:
+    """Снимает стек потока запроса с заданным интервалом.
+
+    Результат — счётчики свёрнутых стеков (collapsed stacks), которые
+    понимают flamegraph.pl, speedscope и inferno.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+class RequestProfile:
+    """Семплер стеков на время одного запроса, в режиме FULL ещё
+    и cProfile.
+
+    cProfile замедляет каждый вызов функции в разы, поэтому выборочные
+    запросы из работы снимаются только семплером, и реже.
+    """
+
+    def __init__(self, mode=FULL):
+        self.profiler = cProfile.Profile() if mode == FULL else None
+        self.sampler = StackSampler(
+            threading.get_ident(),
+            settings.PROFILING_INTERVAL if mode == FULL
+            else settings.PROFILING_SAMPLED_INTERVAL,
+        )
+
+    def __enter__(self):
+        self.sampler.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.sampler.stop()
+
+    def save(self, view_name):
+        """Пишет view/<имя>.folded и, в режиме FULL, view/<имя>.prof
+        (pstats).
+
+        Возвращает имя профиля без расширения.
+        """
+        directory = os.path.join(
+            settings.PROFILING_DIR, view_name.replace(':', '_')
+        )
+        os.makedirs(directory, exist_ok=True)
+        name = (
+            f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-'
+            f'{uuid.uuid4().hex[:8]}'
+        )
+        path = os.path.join(directory, name)
+        if self.profiler is not None:
+            self.profiler.dump_stats(path + '.prof')
+        with open(path + '.folded', 'w', encoding='utf-8') as target:
+            for stack, count in self.sampler.stacks.most_common():
+                target.write(f'{stack} {count}\n')
+        return name
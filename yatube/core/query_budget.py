@@ -0,0 +1,108 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve
+
+from .sql import normalize
+
+MAX_REPEATS = 2
+
+# Служебные запросы, которые не относятся к коду представления:
+# точки сохранения транзакций и хранилище sorl-thumbnail, которое
+# в работе обслуживается из кеша и ходит в БД только при промахе.
+IGNORED = re.compile(
+    r'^(?:(?:RELEASE )?SAVEPOINT|ROLLBACK TO SAVEPOINT)\b|"thumbnail_kvstore"'
+)
+
+
+class QueryRecorder(CaptureQueriesContext):
+    """Записывает все SQL-запросы и ищет среди них N+1."""
+
+    def __init__(self, connection=connection):
+        super().__init__(connection)
+
+    def __len__(self):
+        return len(self.counted_queries)
+
+    @property
+    def counted_queries(self):
+        return [
+            query for query in self.captured_queries
+            if not IGNORED.search(query['sql'])
+        ]
+
+    @property
+    def statements(self):
+        return [query['sql'] for query in self.counted_queries]
+
+    def duplicates(self, max_repeats=MAX_REPEATS):
+        counts = Counter(normalize(sql) for sql in self.statements)
+        return {
+            sql: count for sql, count in counts.items() if count > max_repeats
+        }
+
+    def report(self):
+        return '\n'.join(
+            f'{number}. {sql}'
+            for number, sql in enumerate(self.statements, 1)
+        )
+
+
+@contextmanager
+def query_budget(budget, label='', max_repeats=MAX_REPEATS):
+    """Проверяет, что блок выполнил не больше budget запросов и не
+    содержит N+1.
+
+    Время запросов не проверяется: на общих CI-раннерах оно слишком
+    нестабильно для бюджета.
+    """
+    with QueryRecorder() as recorder:
+        yield recorder
+    problems = []
+    if len(recorder) > budget:
+        problems.append(f'{len(recorder)} запросов при бюджете {budget}')
+    for sql, count in recorder.duplicates(max_repeats).items():
+        problems.append(f'N+1: {count} одинаковых запросов {sql}')
+    if problems:
+        raise AssertionError(
+            f'{label}: ' + '; '.join(problems) + '\n' + recorder.report()
+        )
+
+
+def assert_query_budget(budget, max_repeats=MAX_REPEATS):
+    """Декоратор-вариант query_budget для тестов и функций."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with query_budget(budget, function.__qualname__, max_repeats):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class BudgetClient(Client):
+    """Тестовый клиент, проверяющий бюджет каждого запроса.
+
+    budgets — словарь {'namespace:name': число запросов}; запросы к адресам
+    без бюджета выполняются без проверки.
+    """
+
+    def __init__(self, budgets, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budgets = budgets
+
+    def request(self, **request):
+        try:
+            view_name = resolve(request['PATH_INFO']).view_name
+        except Resolver404:
+            view_name = None
+        budget = self.budgets.get(view_name)
+        if budget is None:
+            return super().request(**request)
+        with query_budget(budget, f'{view_name} {request["PATH_INFO"]}'):
+            return super().request(**request)
@@ -0,0 +1,54 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_local = threading.local()
+
+
+def use_replica():
+    """Направляет чтения текущего потока в одну из реплик.
+
+    Реплика выбирается один раз на запрос, чтобы все его чтения
+    видели один и тот же снимок данных.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    _local.alias = random.choice(replicas) if replicas else None
+    return _local.alias
+
+
+def use_primary():
+    _local.alias = None
+
+
+@contextmanager
+def primary_reads():
+    """Чтения внутри блока идут в default, затем выбор реплики
+    восстанавливается.
+    """
+    alias = read_alias()
+    use_primary()
+    try:
+        yield
+    finally:
+        _local.alias = alias
+
+
+def read_alias():
+    return getattr(_local, 'alias', None)
+
+
+class ReplicaRouter:
+    """Чтения — в реплику, если её выбрал ReplicaMiddleware,
+    иначе и для всех записей — в default.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from hashlib import md5
+
+from django.conf import settings
+
+from .metrics import current_view
+from .sql import normalize
+
+STACK_DEPTH = 6
+
+_lock = threading.Lock()
+_seen = {}
+
+
+def fingerprint(sql):
+    return md5(normalize(sql).encode()).hexdigest()[:12]
+
+
+def stack_excerpt():
+    """Последние кадры стека из кода проекта, без Django и библиотек."""
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(settings.BASE_DIR)
+        and 'site-packages' not in frame.filename
+        and frame.filename != __file__
+    ]
+    return [
+        f'{os.path.relpath(frame.filename, settings.BASE_DIR)}:'
+        f'{frame.lineno} {frame.name}'
+        for frame in frames[-STACK_DEPTH:]
+    ]
+
+
+def explain(connection, sql, params):
+    """План запроса; выполняется в отдельном курсоре без обёрток."""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return []
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else (
+        'EXPLAIN '
+    )
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(prefix + sql, params or ())
+        return [
+            ' '.join(str(column) for column in row)
+            for row in cursor.fetchall()
+        ]
+    except Exception as error:
+        return [f'EXPLAIN не выполнен: {error}']
+    finally:
+        cursor.close()
+
+
+def json_safe(params):
+    if params is None or isinstance(params, (bool, int, float, str)):
+        return params
+    if isinstance(params, dict):
+        return {key: json_safe(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [json_safe(value) for value in params]
+    return str(params)
+
+
+def write(entry):
+    path = settings.SLOW_QUERY_LOG
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = json.dumps(entry, ensure_ascii=False) + '\n'
+    with open(path, 'a', encoding='utf-8') as target:
+        target.write(line)
+
+
+def record(connection, sql, params, many, duration_ms):
+    """Пишет медленный запрос в журнал не чаще раза в интервал.
+
+    Повторы того же запроса внутри SLOW_QUERY_INTERVAL только
+    подсчитываются и попадают в следующую запись как suppressed.
+    """
+    key = fingerprint(sql)
+    now = time.monotonic()
+    with _lock:
+        state = _seen.setdefault(
+            key, {'logged': None, 'suppressed': 0, 'suppressed_ms': 0.0}
+        )
+        logged = state['logged']
+        if logged is not None and now - logged < settings.SLOW_QUERY_INTERVAL:
+            state['suppressed'] += 1
+            state['suppressed_ms'] += duration_ms
+            return
+        suppressed = state['suppressed']
+        suppressed_ms = state['suppressed_ms']
+        state.update(logged=now, suppressed=0, suppressed_ms=0.0)
+    write({
+        'time': datetime.now(timezone.utc).isoformat(),
+        'fingerprint': key,
+        'duration_ms': round(duration_ms, 3),
+        'sql': sql,
+        'params': json_safe(params) if not many else None,
+        'many': many,
+        'view': current_view(),
+        'stack': stack_excerpt(),
+        'plan': [] if many else explain(connection, sql, params),
+        'suppressed': suppressed,
+        'suppressed_ms': round(suppressed_ms, 3),
+        'pid': os.getpid(),
+    })
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """execute_wrapper, записывающий запросы дольше порога."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+            record(context['connection'], sql, params, many, duration_ms)
+
+
+def install(sender, connection, **kwargs):
+    """Обработчик connection_created: подключает журнал к соединению.
+
+    Соединение открывается лениво, уже внутри connection.execute_wrapper
+    у MetricsMiddleware и ServerTimingMiddleware, а те на выходе снимают
+    последнюю обёртку из списка. Поэтому журнал ставится в начало
+    списка, под обёртки запроса, и переживает их снятие.
+    """
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_queries)
+
+
+def reset():
+    with _lock:
+        _seen.clear()
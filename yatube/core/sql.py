@@ -0,0 +1,14 @@
+import re
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'IN \((?:\?|%s)(?:, (?:\?|%s))*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Приводит SQL к шаблону без литералов, чтобы находить повторы."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _SPACE.sub(' ', sql)
+    return _IN_LIST.sub('IN (...)', sql)
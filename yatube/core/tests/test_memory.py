@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import memory
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class MemoryTrackingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Комментарий {n}')
+            for n in range(200)
+        )
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.log = os.path.join(directory, 'memory.jsonl')
+        settings = override_settings(
+            MEMORY_TRACKING=True, MEMORY_LOG=self.log, MEMORY_BUDGET_KB=1
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(tracemalloc.stop)
+        self.client = Client()
+
+    def entries(self):
+        with open(self.log, encoding='utf-8') as source:
+            return [json.loads(line) for line in source]
+
+    def test_request_over_budget_is_flagged(self):
+        """Запрос сверх бюджета помечается и попадает в лог."""
+        url = reverse('posts:post_detail', args=(self.post.id,))
+        with self.assertLogs('yatube.memory', 'WARNING') as logs:
+            self.client.get(url)
+        self.assertIn('posts:post_detail', logs.output[0])
+        entry, = self.entries()
+        self.assertEqual(entry['view'], 'posts:post_detail')
+        self.assertTrue(entry['over_budget'])
+        self.assertGreater(entry['peak_kb'], 1)
+        self.assertTrue(entry['top'])
+        self.assertTrue(all(site['size_kb'] > 0 for site in entry['top']))
+
+    @override_settings(MEMORY_BUDGET_KB=10 ** 6)
+    def test_report(self):
+        """Отчёт группирует запросы по представлениям."""
+        self.client.get(reverse('posts:post_detail', args=(self.post.id,)))
+        self.client.get(reverse('about:author'))
+        self.assertFalse(any(entry['over_budget'] for entry in self.entries()))
+        out = StringIO()
+        call_command('memory_report', log=self.log, stdout=out)
+        output = out.getvalue()
+        self.assertIn('posts:post_detail: 1 запросов', output)
+        self.assertIn('about:author: 1 запросов', output)
+        self.assertIn('сверх бюджета 0', output)
+
+    def test_without_reset_peak_and_resource(self):
+        """До Python 3.9 и вне Unix запрос учитывается без
+        tracemalloc.reset_peak и модуля resource.
+        """
+        legacy = SimpleNamespace(**{
+            name: getattr(tracemalloc, name) for name in (
+                'is_tracing', 'start', 'stop',
+                'take_snapshot', 'get_traced_memory',
+            )
+        })
+        with mock.patch.object(memory, 'tracemalloc', legacy), \
+                mock.patch.dict(sys.modules, {'resource': None}):
+            self.client.get(reverse('posts:post_detail', args=(self.post.id,)))
+        entry, = self.entries()
+        self.assertGreater(entry['peak_kb'], 1)
+        self.assertIsNone(entry['max_rss_kb'])
@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from posts.models import Post
+
+User = get_user_model()
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        settings = override_settings(METRICS_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.client = Client()
+
+    def test_mmap_dict_survives_reopen_and_growth(self):
+        """Значения сохраняются в файле и при его расширении."""
+        path = os.path.join(self.directory, 'values.db')
+        values = metrics.MmapDict(path)
+        for number in range(3000):
+            values.inc(f'metric_{number}', number)
+        values.inc('metric_1', 0.5)
+        values.close()
+        self.assertGreater(os.path.getsize(path), metrics.INITIAL_SIZE)
+        reopened = metrics.MmapDict(path)
+        reopened.inc('metric_2', 1)
+        reopened.close()
+        with open(path, 'rb') as source:
+            entries = {
+                key: value
+                for key, value, _ in metrics.read_entries(source.read())
+            }
+        self.assertEqual(len(entries), 3000)
+        self.assertEqual(entries['metric_1'], 1.5)
+        self.assertEqual(entries['metric_2'], 3)
+
+    def test_worker_processes_are_summed(self):
+        """Значения из файлов разных процессов складываются."""
+        metrics.registry.inc('yatube_db_queries_total', {'view': 'test'}, 2)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                metrics.registry.inc(
+                    'yatube_db_queries_total', {'view': 'test'}, 3
+                )
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.assertEqual(
+            metrics.collect()['yatube_db_queries_total{view="test"}'], 5
+        )
+
+    def test_endpoint_reports_views_and_page_cache(self):
+        """Эндпоинт отдаёт гистограммы по имени URL и попадания в кеш."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('about:author'))
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE yatube_request_duration_seconds histogram', body)
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 2.0',
+            body,
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket'
+            '{le="+Inf",view="about:author"} 1.0',
+            body,
+        )
+        for result in ('hit', 'miss'):
+            self.assertIn(
+                'yatube_cache_requests_total{cache="page",'
+                f'result="{result}",view="posts:index"}} 1.0',
+                body,
+            )
+        buckets = [
+            line for line in body.splitlines()
+            if line.startswith('yatube_request_duration_seconds_bucket')
+            and 'posts:index' in line
+        ]
+        self.assertTrue(buckets[-1].startswith(
+            'yatube_request_duration_seconds_bucket{le="+Inf"'
+        ))
+
+    def test_fragment_cache(self):
+        """Обращения к фрагментам шаблонов считаются по текущему URL."""
+        key = make_template_fragment_key('sidebar')
+        metrics.set_current_view('posts:index')
+        self.addCleanup(metrics.set_current_view, 'unresolved')
+        cache.get(key)
+        cache.set(key, 'html')
+        cache.get(key)
+        cache.get('not-a-fragment')
+        values = metrics.collect()
+        for result in ('hit', 'miss'):
+            self.assertEqual(values[
+                'yatube_cache_requests_total{cache="fragment",'
+                f'result="{result}",view="posts:index"}}'
+            ], 1)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_endpoint_is_not_public(self):
+        """Эндпоинт доступен только сотрудникам и с токеном сборщика."""
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer wrong'
+        ).status_code, 403)
+        self.assertEqual(self.client.get(
+            url, HTTP_AUTHORIZATION='Bearer secret'
+        ).status_code, 200)
+
+    def test_dead_worker_files_are_absorbed(self):
+        """Новый воркер забирает счётчики завершившихся и удаляет их
+        файлы.
+        """
+        pid = os.fork()
+        if pid == 0:
+            try:
+                metrics.registry.inc(
+                    'yatube_db_queries_total', {'view': 'test'}, 3
+                )
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        registry = metrics.Registry()
+        registry.inc('yatube_db_queries_total', {'view': 'test'}, 2)
+        self.assertEqual(
+            os.listdir(self.directory), [f'metrics_{os.getpid()}.db']
+        )
+        self.assertEqual(
+            metrics.collect()['yatube_db_queries_total{view="test"}'], 5
+        )
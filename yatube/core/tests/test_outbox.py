@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import metrics
+from core.mail import deliver, retry_delay
+from core.models import OutboxEmail
+
+User = get_user_model()
+
+LOCMEM = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class BrokenBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('Почтовый сервер недоступен')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxBackend', OUTBOX_EMAIL_BACKEND=LOCMEM
+)
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(
+            username='auth', email='auth@example.com', password='pass'
+        )
+
+    def request_reset(self):
+        Client().post(
+            reverse('users:password_reset_form'),
+            {'email': 'auth@example.com'},
+        )
+
+    def test_reset_email_is_queued(self):
+        """Письмо сброса пароля ставится в очередь, а не отправляется."""
+        self.request_reset()
+        self.assertEqual(mail.outbox, [])
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.recipients, 'auth@example.com')
+
+    def test_command_delivers_queue(self):
+        """send_outbox отправляет письма и убирает их из очереди."""
+        self.request_reset()
+        out = StringIO()
+        call_command('send_outbox', stdout=out)
+        self.assertIn('Отправлено 1', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['auth@example.com'])
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    @override_settings(
+        OUTBOX_EMAIL_BACKEND='core.tests.test_outbox.BrokenBackend',
+        OUTBOX_MAX_ATTEMPTS=2,
+    )
+    def test_failed_delivery_backs_off(self):
+        """Ошибка откладывает письмо, а после всех попыток оно
+        помечается недоставленным.
+        """
+        self.request_reset()
+        self.assertEqual(deliver(10), (0, 1))
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertFalse(email.failed)
+        self.assertGreater(email.next_attempt, timezone.now())
+        self.assertIn('Почтовый сервер недоступен', email.last_error)
+        self.assertEqual(deliver(10), (0, 0))
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        deliver(10)
+        self.assertTrue(OutboxEmail.objects.get().failed)
+
+    def test_retry_delay(self):
+        """Задержка удваивается и ограничена сверху."""
+        self.assertEqual(
+            [retry_delay(attempt) for attempt in (1, 2, 3)], [60, 120, 240]
+        )
+        self.assertEqual(retry_delay(20), 60 * 60)
+
+    def test_queue_depth_metric(self):
+        """Глубина очереди видна в метриках."""
+        self.request_reset()
+        values = metrics.collect()
+        self.assertEqual(values['yatube_outbox_depth{state="pending"}'], 1)
+        self.assertEqual(values['yatube_outbox_depth{state="failed"}'], 0)
@@ -0,0 +1,84 @@
+import os
+import pstats
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.profiling import make_token
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings = override_settings(
+            PROFILING_DIR=self.directory, PROFILING_EVERY=0
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = Client()
+
+    def test_requests_without_token_are_not_profiled(self):
+        """Без подписанного заголовка запрос не профилируется."""
+        for token in (None, 'forged:token'):
+            with self.subTest(token=token):
+                extra = {'HTTP_X_PROFILE': token} if token else {}
+                response = self.client.get(reverse('posts:index'), **extra)
+                self.assertNotIn('X-Profile', response)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_signed_header_writes_profiles_by_view(self):
+        """Запрос с подписанным заголовком пишет pstats и стеки."""
+        response = self.client.get(
+            reverse('posts:index'), HTTP_X_PROFILE=make_token()
+        )
+        stem = os.path.join(
+            self.directory, 'posts_index', response['X-Profile']
+        )
+        stats = pstats.Stats(stem + '.prof')
+        self.assertTrue(any(
+            function[2] == 'index' for function in stats.stats
+        ))
+        self.assertTrue(os.path.exists(stem + '.folded'))
+
+    @override_settings(PROFILING_EVERY=1)
+    def test_sampled_requests_skip_cprofile(self):
+        """Выборочный запрос снимается только семплером, без cProfile."""
+        response = self.client.get(reverse('posts:index'))
+        stem = os.path.join(
+            self.directory, 'posts_index', response['X-Profile']
+        )
+        self.assertTrue(os.path.exists(stem + '.folded'))
+        self.assertFalse(os.path.exists(stem + '.prof'))
+
+    @override_settings(PROFILING_EVERY=1)
+    def test_merge_profiles(self):
+        """Команда сводит свёрнутые стеки и pstats выбранного URL."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'), HTTP_X_PROFILE=make_token())
+        self.client.get(reverse('about:author'))
+        view_dir = os.path.join(self.directory, 'posts_index')
+        with open(os.path.join(view_dir, 'extra.folded'), 'w') as target:
+            target.write('a.py:main;b.py:work 3\na.py:main 1\n')
+        out = StringIO()
+        merged = os.path.join(self.directory, 'merged.prof')
+        call_command(
+            'merge_profiles',
+            dir=self.directory,
+            view=['posts:index'],
+            pstats=merged,
+            stdout=out,
+            stderr=StringIO(),
+        )
+        lines = out.getvalue().splitlines()
+        self.assertIn('a.py:main;b.py:work 3', lines)
+        self.assertTrue(all(
+            line.rpartition(' ')[2].isdigit() for line in lines
+        ))
+        self.assertTrue(pstats.Stats(merged).total_calls > 0)
@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import slow_queries
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SlowQueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.log = os.path.join(directory, 'slow.jsonl')
+        settings = override_settings(
+            SLOW_QUERY_THRESHOLD_MS=0,
+            SLOW_QUERY_LOG=self.log,
+            SLOW_QUERY_INTERVAL=60,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        slow_queries.reset()
+        self.addCleanup(slow_queries.reset)
+
+    def entries(self):
+        with open(self.log, encoding='utf-8') as source:
+            return [json.loads(line) for line in source]
+
+    def run_query(self, username):
+        with connection.execute_wrapper(slow_queries.log_slow_queries):
+            return list(Post.objects.filter(author__username=username))
+
+    def test_entry_contains_plan_params_and_stack(self):
+        """Запись содержит параметры, план запроса и место вызова."""
+        self.assertEqual(len(self.run_query('auth')), 1)
+        entry, = self.entries()
+        self.assertIn('"posts_post"', entry['sql'])
+        self.assertEqual(entry['params'], ['auth'])
+        self.assertTrue(any(
+            'SEARCH' in line or 'SCAN' in line for line in entry['plan']
+        ))
+        self.assertTrue(any('run_query' in line for line in entry['stack']))
+        self.assertEqual(entry['suppressed'], 0)
+
+    def test_repeats_are_rate_limited_and_aggregated(self):
+        """Повторы внутри интервала подавляются и учитываются позже."""
+        for username in ('auth', 'other', 'third'):
+            self.run_query(username)
+        self.assertEqual(len(self.entries()), 1)
+        with override_settings(SLOW_QUERY_INTERVAL=0):
+            self.run_query('fourth')
+        first, second = self.entries()
+        self.assertEqual(first['fingerprint'], second['fingerprint'])
+        self.assertEqual(second['suppressed'], 2)
+
+    def test_command_summarises_top_queries(self):
+        """Команда выводит запросы по суммарному времени с учётом повторов."""
+        for username in ('auth', 'other', 'third'):
+            self.run_query(username)
+        with override_settings(SLOW_QUERY_INTERVAL=0):
+            self.run_query('fourth')
+        out = StringIO()
+        call_command('slow_queries', log=self.log, plans=True, stdout=out)
+        output = out.getvalue()
+        self.assertIn('1. [', output)
+        self.assertIn('4 раз', output)
+        self.assertIn('план:', output)
+
+    def test_install_survives_request_wrappers(self):
+        """Журнал, подключённый при открытии соединения посреди запроса,
+        пишет и следующие запросы: обёртки middleware его не снимают."""
+        default = connections['default']
+        self.addCleanup(
+            setattr, default, 'execute_wrappers', default.execute_wrappers
+        )
+        default.execute_wrappers = []
+        ensure_connection = default.ensure_connection
+        opened = []
+
+        def open_lazily():
+            # Соединение в тестах уже открыто; первый запрос к БД
+            # вызывает обработчик connection_created, как при ленивом
+            # открытии соединения внутри middleware.
+            ensure_connection()
+            if not opened:
+                opened.append(True)
+                slow_queries.install(sender=type(default), connection=default)
+
+        client = Client()
+        with override_settings(SLOW_QUERY_INTERVAL=0), mock.patch.object(
+            default, 'ensure_connection', open_lazily
+        ):
+            for _ in range(3):
+                client.get(reverse('posts:profile', args=['auth']))
+                self.assertEqual(
+                    default.execute_wrappers, [slow_queries.log_slow_queries]
+                )
+        views = [entry['view'] for entry in self.entries()]
+        self.assertGreater(views.count('posts:profile'), 3)
@@ -0,0 +1,58 @@
+import sqlite3
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from core.db import check_connections
+
+
+class SQLiteTuningTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        """Новое соединение получает PRAGMA из SQLITE_PRAGMAS."""
+        expected = {
+            'synchronous': 1,
+            'busy_timeout': 5000,
+            'cache_size': -64 * 1024,
+            'temp_store': 2,
+        }
+        for name, value in expected.items():
+            with self.subTest(pragma=name):
+                self.assertEqual(self.pragma(name), value)
+
+    def test_unusable_connection_is_closed(self):
+        """Соединение, не прошедшее SELECT 1, закрывается до запроса."""
+        connection.ensure_connection()
+        raw = connection.connection
+        self.addCleanup(setattr, connection, 'connection', raw)
+        connection.connection = sqlite3.connect(':memory:')
+        connection.connection.close()
+        with mock.patch.object(connection, 'close') as close:
+            check_connections()
+        close.assert_called_once_with()
+
+    def test_usable_connection_is_kept(self):
+        """Рабочее соединение переиспользуется."""
+        connection.ensure_connection()
+        with mock.patch.object(connection, 'close') as close:
+            check_connections()
+        close.assert_not_called()
+
+    def test_bench_sqlite(self):
+        """Бенчмарк печатает результаты для обоих режимов."""
+        out = StringIO()
+        call_command(
+            'bench_sqlite', seconds=0.2, rows=100, readers=2, writers=1,
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('default'))
+        self.assertTrue(lines[1].startswith('tuned'))
@@ -0,0 +1,68 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import timing
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(author=cls.user, group=cls.group, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def parse(self, header):
+        metrics = {}
+        for entry in header.split(', '):
+            name, *params = entry.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_header_breakdown(self):
+        """Заголовок содержит время БД с числом запросов, шаблонов и кеша."""
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            response = self.client.get(reverse('posts:index'))
+        metrics = self.parse(response['Server-Timing'])
+        self.assertEqual(metrics['db']['desc'], '"DB (2)"')
+        self.assertEqual(metrics['tpl']['desc'], '"Templates (1)"')
+        self.assertIn('cache', metrics)
+        self.assertGreaterEqual(
+            float(metrics['total']['dur']), float(metrics['tpl']['dur'])
+        )
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:index')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['db_count'], 2)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request(self):
+        """Запросы вне выборки не получают заголовок и не замеряются."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertIsNone(timing.current())
+
+    def test_nested_calls_counted_once(self):
+        """get_or_set учитывается как одно обращение к кешу."""
+        timings = timing.start()
+        try:
+            cache.get_or_set('key', 'value')
+        finally:
+            timing.stop()
+        self.assertEqual(timings.counts['cache'], 1)
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.test import TestCase
+
+from core import warmup
+from core.management.commands.import_profile import parse
+from posts.cache import groups
+from posts.models import Group, Post
+
+IMPORTTIME = '''import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      3000 |       3120 | yatube.wsgi
+'''
+
+User = get_user_model()
+
+
+class WarmupTests(TestCase):
+    def test_all_steps_succeed(self):
+        """Все шаги прогрева проходят без ошибок."""
+        group = Group.objects.create(
+            title='Группа', slug='group', description=''
+        )
+        Group.objects.create(title='Пустая', slug='empty', description='')
+        Post.objects.create(
+            author=User.objects.create_user(username='auth'),
+            group=group,
+            text='Пост',
+        )
+        cache.clear()
+        report = warmup.run()
+        for name, _ in warmup.STEPS:
+            with self.subTest(step=name):
+                self.assertIsNotNone(report[name]['result'])
+        self.assertGreater(report['templates']['result'], 20)
+        self.assertEqual(report['cache']['result'], 1)
+        with self.assertNumQueries(0):
+            groups.get('group')
+
+    def test_password_change_done_template(self):
+        """Шаблон смены пароля компилируется."""
+        get_template('users/password_change_done.html')
+
+    def test_parse_importtime(self):
+        """Разбор вывода python -X importtime."""
+        imports = parse(IMPORTTIME)
+        self.assertEqual(
+            [(item.module, item.self_us, item.depth) for item in imports],
+            [('_io', 120, 1), ('yatube.wsgi', 3000, 0)],
+        )
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Метрики Server-Timing и их описания в порядке вывода; заголовки
+# HTTP допускают только latin-1, поэтому описания на английском.
+METRICS = {
+    'db': 'DB',
+    'tpl': 'Templates',
+    'thumb': 'Thumbnails',
+    'cache': 'Cache',
+}
+
+CACHE_METHODS = (
+    'get', 'set', 'add', 'delete', 'get_many', 'set_many', 'delete_many',
+    'get_or_set', 'incr', 'decr', 'touch',
+)
+
+_local = threading.local()
+
+
+class Timings:
+    """Накопленное время и число вызовов по метрикам одного запроса.
+
+    Вложенные вызовы одной метрики (например, get_or_set внутри
+    которого get и add) учитываются один раз.
+    """
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.started = time.perf_counter()
+        self.total_ms = None
+        self._active = set()
+
+    @contextmanager
+    def track(self, name):
+        if name in self._active:
+            yield
+            return
+        self._active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] += (time.perf_counter() - started) * 1000
+            self.counts[name] += 1
+            self._active.discard(name)
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def header(self):
+        """Значение заголовка Server-Timing.
+
+        Метрики могут перекрываться: запросы ленивых queryset'ов
+        выполняются во время рендеринга и входят и в db, и в tpl.
+        """
+        entries = [
+            f'{name};dur={self.durations[name]:.2f};'
+            f'desc="{description} ({self.counts[name]})"'
+            for name, description in METRICS.items()
+            if name in self.counts
+        ]
+        entries.append(f'total;dur={self.total_ms:.2f}')
+        return ', '.join(entries)
+
+    def as_dict(self):
+        data = {'total_ms': round(self.total_ms, 2)}
+        for name in METRICS:
+            data[f'{name}_ms'] = round(self.durations.get(name, 0), 2)
+            data[f'{name}_count'] = self.counts.get(name, 0)
+        return data
+
+
+def start():
+    _local.timings = Timings()
+    return _local.timings
+
+
+def stop():
+    timings = current()
+    _local.timings = None
+    if timings is not None:
+        timings.finish()
+    return timings
+
+
+def current():
+    return getattr(_local, 'timings', None)
+
+
+def timed(name, function):
+    """Оборачивает функцию замером метрики name.
+
+    Вне замеряемого запроса обёртка сводится к одной проверке
+    thread-local, поэтому её можно держать включённой всегда.
+    """
+    if getattr(function, 'timed_metric', None) == name:
+        return function
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        timings = current()
+        if timings is None:
+            return function(*args, **kwargs)
+        with timings.track(name):
+            return function(*args, **kwargs)
+    wrapper.timed_metric = name
+    return wrapper
+
+
+def database(execute, sql, params, many, context):
+    """execute_wrapper для подключений к БД."""
+    timings = current()
+    if timings is None:
+        return execute(sql, params, many, context)
+    with timings.track('db'):
+        return execute(sql, params, many, context)
+
+
+def install():
+    """Подключает замеры к шаблонам, sorl-thumbnail и кешам.
+
+    Методы классов подменяются для всего процесса один раз при запуске;
+    вне замеряемого запроса обёртки ничего не делают (см. timed).
+    """
+    from django.template.backends.django import Template
+    from sorl.thumbnail.base import ThumbnailBackend
+
+    Template.render = timed('tpl', Template.render)
+    ThumbnailBackend.get_thumbnail = timed(
+        'thumb', ThumbnailBackend.get_thumbnail
+    )
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        for method in CACHE_METHODS:
+            if hasattr(backend, method):
+                setattr(backend, method, timed(
+                    'cache', getattr(backend, method)
+                ))
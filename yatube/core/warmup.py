@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.urls import get_resolver
+from django.utils import formats, timezone, translation
+
+logger = logging.getLogger('yatube.warmup')
+
+
+def project_templates():
+    """Имена шаблонов из каталогов TEMPLATES['DIRS']."""
+    for engine in engines.all():
+        for directory in engine.engine.dirs:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if name.endswith('.html'):
+                        yield os.path.relpath(
+                            os.path.join(root, name), directory
+                        ).replace(os.sep, '/')
+
+
+def warm_templates():
+    """Компилирует шаблоны проекта; с кеширующим загрузчиком (DEBUG
+    выключен) они остаются в памяти процесса.
+    """
+    engine = engines['django']
+    compiled = 0
+    for name in sorted(set(project_templates())):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            logger.warning('Шаблон %s не компилируется: %s', name, error)
+        else:
+            compiled += 1
+    return compiled
+
+
+def warm_urls():
+    """Заполняет таблицы разрешения и обращения URL всех пространств имён."""
+    resolvers = [get_resolver()]
+    count = 0
+    while resolvers:
+        resolver = resolvers.pop()
+        resolver.reverse_dict
+        count += 1
+        resolvers.extend(
+            namespace_resolver
+            for _, namespace_resolver in resolver.namespace_dict.values()
+        )
+    return count
+
+
+def warm_translations():
+    """Загружает каталог переводов и форматы дат LANGUAGE_CODE."""
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('Page not found')
+        formats.date_format(timezone.now(), 'd E Y')
+    return settings.LANGUAGE_CODE
+
+
+def warm_thumbnails():
+    """Создаёт движок, хранилище ключей и бэкенд sorl-thumbnail."""
+    from PIL import Image
+    from sorl.thumbnail import default
+
+    Image.init()
+    for lazy in (default.engine, default.kvstore, default.backend,
+                 default.storage):
+        lazy._setup()
+    return type(default.engine).__name__
+
+
+def warm_cache():
+    """Заполняет версию постов и кеш групп, самых частых среди
+    последних WARMUP_POSTS постов.
+
+    Запрос ограничен последними постами по индексу pub_date: агрегат
+    по всей posts_post в каждом воркере замедлял бы запуск с ростом
+    данных.
+    """
+    from posts.cache import groups, posts_version
+    from posts.models import Post
+
+    posts_version()
+    recent = Post.objects.order_by('-pub_date').values_list(
+        'group__slug', flat=True
+    )[:settings.WARMUP_POSTS]
+    slugs = [
+        slug for slug, _ in Counter(
+            slug for slug in recent if slug is not None
+        ).most_common(settings.WARMUP_GROUPS)
+    ]
+    for slug in slugs:
+        groups.get(slug)
+    return len(slugs)
+
+
+STEPS = (
+    ('urls', warm_urls),
+    ('templates', warm_templates),
+    ('translations', warm_translations),
+    ('thumbnails', warm_thumbnails),
+    ('cache', warm_cache),
+)
+
+
+def run():
+    """Прогревает процесс при загрузке WSGI-приложения.
+
+    Ошибка шага пишется в лог и не мешает запуску. Соединения с БД
+    в конце закрываются: при --preload воркеры после fork не должны
+    делить соединение мастера.
+    """
+    report = {}
+    try:
+        for name, step in STEPS:
+            started = time.perf_counter()
+            try:
+                result = step()
+            except Exception:
+                logger.exception('Прогрев %s не удался', name)
+                result = None
+            report[name] = {
+                'result': result,
+                'ms': round((time.perf_counter() - started) * 1000, 1),
+            }
+    finally:
+        connections.close_all()
+    logger.info(json.dumps({'warmup': report}, ensure_ascii=False))
+    return report
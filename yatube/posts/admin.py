@@ -1,29 +1,88 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 
 from .models import Group, Post, Comment, Follow
+from .search import filter_comments, filter_posts
+from .utils import EstimatedCountPaginator
 
 
-class PostAdmin(admin.ModelAdmin):
+class EstimatedChangeList(ChangeList):
+    """Показывает число строк, уточнённое пагинатором при чтении страницы.
+
+    Если список выводится без разбиения на страницы, оценку заменяет
+    длина самого списка: он всё равно читается целиком для вывода.
+    """
+
+    def get_results(self, request):
+        super().get_results(request)
+        paged = self.multi_page and not (self.show_all and self.can_show_all)
+        if self.paginator.estimated and not paged:
+            self.paginator.clamp(len(self.result_list))
+        self.result_count = self.paginator.count
+        self.multi_page = self.result_count > self.list_per_page
+
+
+class EstimatedCountAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedChangeList
+
+
+class PostAdmin(EstimatedCountAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
-    list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('group',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return filter_posts(queryset, search_term), False
+
+
+class CommentAdmin(EstimatedCountAdmin):
+    """Комментарии ищутся по точному имени автора или по тексту через
+    полнотекстовый индекс posts_comment_fts."""
 
-class CommentAdmin(admin.ModelAdmin):
     list_display = ('author', 'post', 'created', 'text')
-    list_filter = ('author', 'created')
-    search_fields = ('author', 'post', 'text')
+    list_select_related = ('author', 'post')
+    list_filter = ('created',)
+    ordering = ('-created',)
+    search_fields = ('=author__username',)
+    raw_id_fields = ('author', 'post')
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return (
+            filter_comments(queryset, search_term)
+            | queryset.filter(author__username=search_term)
+        ), False
 
-class FollowAdmin(admin.ModelAdmin):
+
+class FollowAdmin(EstimatedCountAdmin):
     list_display = ('pk', 'user', 'author')
-    search_fields = ('user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('=user__username', '=author__username')
+    raw_id_fields = ('user', 'author')
     empty_value_display = '-пусто-'
 
 
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', '=slug')
+
+
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
 admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,231 @@
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+from sorl.thumbnail import get_thumbnail
+
+from users.cache import authors
+from .cache import cache_page_unless_pinned, groups
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .utils import decode_cursor, encode_cursor
+from .views import CACHE_TIME
+
+logger = logging.getLogger(__name__)
+
+MAX_LIMIT = 100
+
+THUMBNAIL_GEOMETRY = '960x339'
+
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+
+
+class ApiError(Exception):
+    pass
+
+
+def thumbnail_url(image):
+    if not image:
+        return None
+    try:
+        return get_thumbnail(
+            image, THUMBNAIL_GEOMETRY, crop='center', upscale=True
+        ).url
+    except Exception:
+        logger.exception('Не удалось построить миниатюру %s', image)
+        return None
+
+
+def media_url(image):
+    return settings.MEDIA_URL + image if image else None
+
+
+POST_DERIVED = {
+    'image': ('image', media_url),
+    'thumbnail': ('image', thumbnail_url),
+}
+
+
+def api_view(view):
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return JsonResponse(view(request, *args, **kwargs))
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'error': 'Не найдено'}, status=404)
+    return wrapper
+
+
+def parse_fields(request, fields, derived):
+    """Возвращает запрошенные поля ответа и нужные для них столбцы."""
+    available = list(fields) + [
+        name for name in derived if name not in fields
+    ]
+    requested = request.GET.get('fields')
+    if not requested:
+        names = available
+    else:
+        names = [name.strip() for name in requested.split(',')]
+        unknown = set(names) - set(available)
+        if unknown:
+            raise ApiError(
+                'Неизвестные поля: ' + ', '.join(sorted(unknown))
+            )
+    columns = {'id'}
+    for name in names:
+        source = derived[name][0] if name in derived else name
+        columns.add(fields[source])
+    return names, columns
+
+
+def serialize(row, names, fields, derived):
+    data = {}
+    for name in names:
+        if name in derived:
+            source, convert = derived[name]
+            data[name] = convert(row[fields[source]])
+        else:
+            data[name] = row[fields[name]]
+    return data
+
+
+def parse_date(value):
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError('Некорректная дата')
+    return date
+
+
+def get_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.PAGE_COUNT))
+    except ValueError:
+        raise ApiError('Некорректный limit')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def cursor_page(request, queryset, date_field, fields, derived=None,
+                archive=None):
+    """Страница выборки по курсору (date_field, id) в порядке убывания.
+
+    Строки читаются через values(), экземпляры моделей не создаются.
+    archive — более старая выборка с теми же полями, которая
+    продолжает основную, когда та заканчивается.
+    """
+    derived = derived or {}
+    names, columns = parse_fields(request, fields, derived)
+    columns.add(date_field)
+    limit = get_limit(request)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            cursor = decode_cursor(cursor, parse_date, int)
+        except ValueError as error:
+            raise ApiError(str(error))
+    rows = []
+    for tier in (queryset, archive):
+        if tier is None or len(rows) > limit:
+            continue
+        tier = tier.order_by(f'-{date_field}', '-id')
+        if cursor:
+            date, pk = cursor
+            tier = tier.filter(
+                Q(**{f'{date_field}__lt': date})
+                | Q(**{date_field: date, 'id__lt': pk})
+            )
+        rows.extend(tier.values(*columns)[:limit + 1 - len(rows)])
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        query = request.GET.copy()
+        query['cursor'] = encode_cursor(
+            rows[-1][date_field].isoformat(), rows[-1]['id']
+        )
+        next_url = f'{request.path}?{query.urlencode()}'
+    return {
+        'results': [
+            serialize(row, names, fields, derived) for row in rows
+        ],
+        'next': next_url,
+    }
+
+
+@cache_page_unless_pinned(CACHE_TIME)
+@api_view
+def index(request):
+    return cursor_page(
+        request, Post.objects.all(), 'pub_date', POST_FIELDS, POST_DERIVED
+    )
+
+
+@api_view
+def group_list(request, slug):
+    group = groups.get_or_404(slug)
+    return cursor_page(
+        request,
+        group.posts.all(),
+        'pub_date',
+        POST_FIELDS,
+        POST_DERIVED,
+        archive=group.archived_posts.all(),
+    )
+
+
+@api_view
+def profile(request, username):
+    author = authors.get_or_404(username)
+    return cursor_page(
+        request,
+        author.posts.all(),
+        'pub_date',
+        POST_FIELDS,
+        POST_DERIVED,
+        archive=author.archived_posts.all(),
+    )
+
+
+@api_view
+def post_detail(request, post_id):
+    names, columns = parse_fields(request, POST_FIELDS, POST_DERIVED)
+    row = Post.objects.filter(id=post_id).values(*columns).first()
+    if row is None:
+        row = ArchivedPost.objects.filter(id=post_id).values(*columns).first()
+    if row is None:
+        raise Http404
+    return serialize(row, names, POST_FIELDS, POST_DERIVED)
+
+
+@api_view
+def comments(request, post_id):
+    comments = Comment.objects.filter(post_id=post_id)
+    if not Post.objects.filter(id=post_id).exists():
+        if not ArchivedPost.objects.filter(id=post_id).exists():
+            raise Http404
+        comments = ArchivedComment.objects.filter(post_id=post_id)
+    return cursor_page(
+        request,
+        comments,
+        'created',
+        COMMENT_FIELDS,
+    )
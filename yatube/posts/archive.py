@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from .cache import bump_posts_version
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+ARCHIVE_BATCH_SIZE = 1000
+
+POST_COLUMNS = ('id', 'text', 'pub_date', 'author_id', 'group_id', 'image')
+
+COMMENT_COLUMNS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+class TieredPosts:
+    """Посты горячей таблицы, а за ними архив — как одна выборка
+    для Paginator.
+
+    Архив пополняется по дате, поэтому архивные посты старше всех
+    оставшихся в posts_post, и склейка двух выборок по убыванию даты
+    сохраняет общий порядок. Архив читается, только когда страница
+    выходит за пределы горячих постов.
+    """
+
+    ordered = True
+
+    def __init__(self, hot, archive):
+        self.hot = hot
+        self.archive = archive
+
+    @cached_property
+    def hot_count(self):
+        return self.hot.count()
+
+    def count(self):
+        return self.hot_count + self.archive.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop
+        items = []
+        if start < self.hot_count:
+            items.extend(self.hot[start:stop])
+        if stop is None or stop > self.hot_count:
+            items.extend(self.archive[
+                max(start - self.hot_count, 0):
+                None if stop is None else stop - self.hot_count
+            ])
+        return items
+
+
+def archive_batch(cutoff, batch_size):
+    """Переносит в архив до batch_size самых старых постов до cutoff
+    вместе с комментариями. Возвращает (постов, комментариев).
+    """
+    with transaction.atomic():
+        ids = list(
+            Post.objects.filter(pub_date__lt=cutoff)
+            .order_by('pub_date', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0, 0
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**row) for row in
+            Post.objects.filter(id__in=ids).values(*POST_COLUMNS)
+        )
+        comments = Comment.objects.filter(post_id__in=ids)
+        archived_comments = ArchivedComment.objects.bulk_create(
+            ArchivedComment(**row) for row in
+            comments.order_by().values(*COMMENT_COLUMNS)
+        )
+        comments.delete()
+        Post.objects.filter(id__in=ids).delete()
+    return len(ids), len(archived_comments)
+
+
+def archive_posts(cutoff, batch_size=ARCHIVE_BATCH_SIZE, progress=None):
+    """Переносит все посты старше cutoff пакетами по batch_size.
+
+    Каждый пакет — отдельная транзакция, так что перенос можно
+    прервать и продолжить. progress вызывается после каждого пакета
+    с накопленными числами постов и комментариев.
+    """
+    posts = comments = 0
+    while True:
+        moved_posts, moved_comments = archive_batch(cutoff, batch_size)
+        if not moved_posts:
+            break
+        posts += moved_posts
+        comments += moved_comments
+        if progress is not None:
+            progress(posts, comments)
+    if posts:
+        bump_posts_version()
+    return posts, comments
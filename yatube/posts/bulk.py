@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .search import rebuild_index
+
+BULK_TABLES = ('posts_post', 'posts_comment', 'posts_follow')
+
+
+# Архивные таблицы сохраняют id перенесённых строк, поэтому новые id
+# выдаются после максимума по обеим таблицам.
+ARCHIVES = {Post: ArchivedPost, Comment: ArchivedComment}
+
+
+def next_id(model):
+    tables = (model, ARCHIVES[model]) if model in ARCHIVES else (model,)
+    return max(
+        table.objects.aggregate(last=Max('pk'))['last'] or 0
+        for table in tables
+    ) + 1
+
+
+def parse_timestamp(value):
+    if not value:
+        return timezone.now()
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date, timezone.utc)
+    return date
+
+
+@contextmanager
+def preserved_timestamps():
+    """Отключает auto_now_add, чтобы bulk_create сохранял исходные даты."""
+    fields = (
+        Post._meta.get_field('pub_date'),
+        Comment._meta.get_field('created'),
+    )
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+@contextmanager
+def deferred_indexes(tables=BULK_TABLES):
+    """Снимает вторичные индексы и триггеры на время массовой загрузки.
+
+    После загрузки они создаются заново одним проходом по таблице,
+    а полнотекстовый индекс постов перестраивается. Работает только
+    для SQLite, на других СУБД ничего не делает.
+    """
+    if connection.vendor != 'sqlite' or not tables:
+        yield
+        return
+    placeholders = ', '.join(['%s'] * len(tables))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE type IN ('index', 'trigger') AND sql IS NOT NULL "
+            f"AND tbl_name IN ({placeholders})",
+            tables,
+        )
+        objects = cursor.fetchall()
+        for object_type, name, sql in objects:
+            cursor.execute(f'DROP {object_type.upper()} IF EXISTS "{name}"')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for object_type, name, sql in sorted(
+                objects, key=lambda item: item[0] != 'index'
+            ):
+                cursor.execute(sql)
+        if 'posts_post' in tables:
+            rebuild_index()
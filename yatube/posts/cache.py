@@ -0,0 +1,72 @@
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.middleware.cache import CacheMiddleware
+from django.utils.decorators import decorator_from_middleware_with_args
+from django.views.decorators.cache import cache_page
+
+from core.middleware import pinned_to_primary
+from core.object_cache import ObjectCache
+from .models import Group
+
+POSTS_VERSION_KEY = 'posts:version'
+
+
+def posts_version():
+    """Версия данных постов — время последней записи в секундах.
+
+    Меняется при каждом сохранении или удалении поста, комментария
+    или группы, поэтому годится и как часть ключа кеша, и как
+    ETag/Last-Modified для лент.
+    """
+    version = cache.get(POSTS_VERSION_KEY)
+    if version is None:
+        version = time.time()
+        if not cache.add(POSTS_VERSION_KEY, version, None):
+            version = cache.get(POSTS_VERSION_KEY, version)
+    return version
+
+
+def bump_posts_version():
+    cache.set(POSTS_VERSION_KEY, time.time(), None)
+
+
+def versioned_cache_page(timeout):
+    """cache_page для анонимных посетителей с posts_version() в ключе.
+
+    Любая запись поста, комментария или группы меняет версию, так что
+    страницы можно держать долго без устаревания. Залогиненным страница
+    всегда строится заново: в ней их кнопки подписки и формы.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            cached_view = decorator_from_middleware_with_args(
+                CacheMiddleware
+            )(cache_timeout=timeout, key_prefix=f'posts.{posts_version()}')
+            return cached_view(view)(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_page_unless_pinned(timeout):
+    """cache_page, мимо которого идут сессии, закреплённые за основной
+    БД после записи: из кеша они получили бы страницу без своих
+    изменений.
+    """
+    def decorator(view):
+        cached_view = cache_page(timeout)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if pinned_to_primary(request):
+                return view(request, *args, **kwargs)
+            return cached_view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+groups = ObjectCache(Group, 'slug', 'group')
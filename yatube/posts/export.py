@@ -0,0 +1,114 @@
+import csv
+import heapq
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+EXPORT_CHUNK_SIZE = 2000
+
+GZIP_BUFFER_SIZE = 64 * 1024
+
+COLUMNS = ('type', 'id', 'post', 'date', 'group', 'image', 'text')
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def by_id(querysets, fields, chunk_size):
+    """Склеивает выборки горячей таблицы и архива в один поток по id.
+
+    id в архиве совпадают с исходными, поэтому порядок выгрузки
+    не зависит от того, успел ли archive_posts перенести строку.
+    """
+    return heapq.merge(*(
+        queryset.order_by('id').values_list(*fields).iterator(
+            chunk_size=chunk_size
+        )
+        for queryset in querysets
+    ), key=lambda row: row[0])
+
+
+def export_rows(author, chunk_size=EXPORT_CHUNK_SIZE):
+    """Построчно отдаёт посты и комментарии автора, включая архив.
+
+    Все выборки читаются через iterator(), поэтому в памяти одновременно
+    находится не больше нескольких chunk_size строк, сколько бы их ни
+    было.
+    """
+    posts = by_id(
+        (
+            Post.objects.filter(author=author),
+            ArchivedPost.objects.filter(author=author),
+        ),
+        ('id', 'pub_date', 'group__slug', 'image', 'text'),
+        chunk_size,
+    )
+    for post_id, pub_date, group, image, text in posts:
+        yield dict(zip(
+            COLUMNS, ('post', post_id, None, pub_date, group, image, text)
+        ))
+    comments = by_id(
+        (
+            Comment.objects.filter(author=author),
+            ArchivedComment.objects.filter(author=author),
+        ),
+        ('id', 'post_id', 'created', 'text'),
+        chunk_size,
+    )
+    for comment_id, post_id, created, text in comments:
+        yield dict(zip(
+            COLUMNS,
+            ('comment', comment_id, post_id, created, None, None, text)
+        ))
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.DictWriter(Echo(), fieldnames=COLUMNS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def encode(lines):
+    for line in lines:
+        yield line.encode()
+
+
+def gzip_stream(chunks, buffer_size=GZIP_BUFFER_SIZE):
+    """Сжимает поток байтов в формат gzip по мере поступления данных."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            data = compressor.compress(b''.join(buffer))
+            buffer, size = [], 0
+            if data:
+                yield data
+    yield compressor.compress(b''.join(buffer)) + compressor.flush()
+
+
+def export_stream(author, export_format='ndjson', gzip=False,
+                  chunk_size=EXPORT_CHUNK_SIZE):
+    lines = ndjson_lines if export_format == 'ndjson' else csv_lines
+    stream = encode(lines(export_rows(author, chunk_size)))
+    if gzip:
+        stream = gzip_stream(stream)
+    return stream
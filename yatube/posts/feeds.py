@@ -0,0 +1,124 @@
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+from django.views.decorators.http import condition
+
+from users.cache import authors
+from .cache import groups, posts_version
+from .models import Post
+
+FEED_SIZE = 20
+
+FEED_CACHE_TIME = 60 * 60
+
+
+def feed_etag(request, *args, **kwargs):
+    return repr(posts_version())
+
+
+def feed_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(posts_version(), timezone.utc)
+
+
+def cached_feed(feed):
+    """Кеширует ленту до следующей записи поста и отвечает на условный GET.
+
+    Ключ кеша включает версию постов, поэтому после сохранения или
+    удаления поста лента строится заново, а до тех пор клиент с
+    актуальным ETag/If-Modified-Since получает 304 без обращения к БД.
+    """
+    @condition(etag_func=feed_etag, last_modified_func=feed_last_modified)
+    @wraps(feed)
+    def view(request, *args, **kwargs):
+        key = f'posts:feed:{posts_version()!r}:{request.get_full_path()}'
+        response = cache.get(key)
+        if response is None:
+            response = feed(request, *args, **kwargs)
+            cache.set(key, response, FEED_CACHE_TIME)
+        return response
+    return view
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние обновления'
+    link = reverse_lazy('posts:index')
+    description = 'Новые записи всех авторов'
+
+    def items(self):
+        return Post.objects.feed()[:FEED_SIZE]
+
+    def item_title(self, item):
+        return Truncator(item.text).chars(50)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.id,))
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_categories(self, item):
+        return (item.group.title,) if item.group else ()
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return groups.get_or_404(slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=(obj.slug,))
+
+    def description(self, obj):
+        return obj.description
+
+    def items(self, obj):
+        return obj.posts.feed()[:FEED_SIZE]
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return authors.get_or_404(username)
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=(obj.username,))
+
+    def description(self, obj):
+        return f'Записи пользователя {obj.username}'
+
+    def items(self, obj):
+        return obj.posts.feed()[:FEED_SIZE]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
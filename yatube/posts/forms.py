@@ -1,9 +1,67 @@
 from django import forms
+from django.db.models import F
+from sorl.thumbnail import delete as delete_thumbnails
 
-from .models import Post, Comment
+from .cache import bump_posts_version
+from .models import Group, Post, Comment
+from .search import decode_cursor
+
+
+class EditConflict(Exception):
+    """Пост изменили после того, как форма правки была открыта."""
 
 
 class PostForm(forms.ModelForm):
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is None:
+            del self.fields['version']
+        else:
+            self.fields['version'].initial = self.instance.version
+
+    def save(self, commit=True):
+        """Новый пост сохраняется целиком, правка — только изменёнными
+        полями.
+
+        Изменённые поля и новая версия пишутся одним UPDATE с проверкой
+        версии, так что из двух одновременных правок одной формы вторая
+        получает EditConflict. Форма без версии (не из шаблона правки)
+        сохраняется по-старому: побеждает последняя запись. Миниатюры
+        старой картинки удаляются, только если картинку заменили.
+        """
+        if self.instance.pk is None or not commit:
+            return super().save(commit)
+        post = super().save(commit=False)
+        changed = [
+            name for name in self.changed_data if name in self._meta.fields
+        ]
+        if not changed:
+            return post
+        expected = self.cleaned_data['version']
+        values = {}
+        for name in changed:
+            field = post._meta.get_field(name)
+            values[field.attname] = field.pre_save(post, add=False)
+        posts = Post.objects.filter(pk=post.pk)
+        if expected is not None:
+            posts = posts.filter(version=expected)
+        updated = posts.update(version=F('version') + 1, **values)
+        if not updated:
+            if 'image' in changed and post.image:
+                post.image.delete(save=False)
+            raise EditConflict
+        if expected is None:
+            post.refresh_from_db(fields=['version'])
+        else:
+            post.version = expected + 1
+        bump_posts_version()
+        old_image = self.initial.get('image')
+        if 'image' in changed and old_image:
+            delete_thumbnails(old_image, delete_file=False)
+        return post
+
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
@@ -27,3 +85,24 @@ class CommentForm(forms.ModelForm):
         help_texts = {
             'text': 'Текст комментария'
         }
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Поиск', max_length=200)
+    group = forms.ModelChoiceField(
+        label='Группа',
+        queryset=Group.objects.all(),
+        to_field_name='slug',
+        required=False,
+    )
+    author = forms.CharField(label='Автор', max_length=150, required=False)
+    cursor = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def clean_cursor(self):
+        cursor = self.cleaned_data['cursor']
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError as error:
+                raise forms.ValidationError(str(error))
+        return cursor
@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posts.archive import ARCHIVE_BATCH_SIZE, archive_posts
+from posts.bulk import parse_timestamp
+from posts.models import Post
+
+DEFAULT_DAYS = 365
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше отсечки вместе с комментариями '
+        'в архивные таблицы. Профиль и лента группы продолжают '
+        'показывать их на дальних страницах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=DEFAULT_DAYS,
+            help='Архивировать посты старше этого числа дней',
+        )
+        parser.add_argument(
+            '--before', help='Отсечка датой ISO 8601 вместо --days'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=ARCHIVE_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать посты к переносу',
+        )
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = parse_timestamp(options['before'])
+            except ValueError as error:
+                raise CommandError(str(error))
+        else:
+            cutoff = timezone.now() - timedelta(days=options['days'])
+        if options['dry_run']:
+            count = Post.objects.filter(pub_date__lt=cutoff).count()
+            self.stdout.write(f'К переносу {count} постов до {cutoff}')
+            return
+        started = time.monotonic()
+        posts, comments = archive_posts(
+            cutoff, options['batch_size'], self.progress
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'В архив перенесено {posts} постов и {comments} комментариев '
+            f'за {time.monotonic() - started:.1f} c'
+        ))
+
+    def progress(self, posts, comments):
+        self.stdout.write(f'{posts} постов, {comments} комментариев')
@@ -0,0 +1,103 @@
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Engine, engines
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# Прежний способ вывода ленты: атрибуты и {% url %} разбираются в шаблоне.
+INCLUDE_TEMPLATE = (
+    "{% for post in posts %}\n"
+    "{% include 'posts/includes/article.html' "
+    "with author_link=True group_link=True %}\n"
+    "{% endfor %}"
+)
+
+ROWS_TEMPLATE = (
+    "{% load post_rows %}"
+    "{% post_rows posts author_link=True group_link=True as rows %}"
+    "{% for row in rows %}\n"
+    "{% include 'posts/includes/post_row.html' %}\n"
+    "{% endfor %}"
+)
+
+
+def production_engine():
+    """Движок шаблонов проекта с кеширующим загрузчиком, как при
+    DEBUG = False: иначе замер включал бы разбор подключаемых шаблонов
+    на каждой странице.
+    """
+    engine = engines['django'].engine
+    return Engine(
+        dirs=engine.dirs,
+        loaders=[('django.template.loaders.cached.Loader', engine.loaders)],
+        libraries=engine.libraries,
+    )
+
+
+def sample_posts(count):
+    """Посты в памяти, без БД: замеряется только шаблон."""
+    group = Group(id=1, title='Группа', slug='group')
+    authors = [
+        User(id=number, username=f'author{number}', first_name='Автор',
+             last_name=str(number))
+        for number in range(1, 11)
+    ]
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        Post(
+            id=number,
+            text=f'Текст поста {number} <b>с разметкой</b> ' * 5,
+            pub_date=started - timedelta(hours=number),
+            author=authors[number % len(authors)],
+            group=group if number % 2 else None,
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает вывод ленты через article.html и через строки '
+        'post_rows: проверяет, что HTML совпадает, и замеряет время.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10)
+        parser.add_argument(
+            '--repeat', type=int, default=2000,
+            help='Сколько раз вывести ленту; берётся лучшее время',
+        )
+
+    def handle(self, *args, **options):
+        context = {'posts': sample_posts(options['posts'])}
+        engine = production_engine()
+        paths = {
+            'include': engine.from_string(INCLUDE_TEMPLATE),
+            'post_rows': engine.from_string(ROWS_TEMPLATE),
+        }
+        outputs = {
+            name: template.render(Context(context))
+            for name, template in paths.items()
+        }
+        if outputs['include'] != outputs['post_rows']:
+            raise CommandError('HTML post_rows отличается от article.html')
+        self.stdout.write('HTML совпадает')
+        results = {}
+        for name, template in paths.items():
+            results[name] = min(timeit.repeat(
+                lambda: template.render(Context(context)),
+                number=1,
+                repeat=options['repeat'],
+            )) * 1000
+            self.stdout.write(
+                f'{name:<10} {results[name]:.3f} мс на ленту '
+                f'из {options["posts"]} постов'
+            )
+        self.stdout.write(
+            f'Ускорение: {results["include"] / results["post_rows"]:.2f}x'
+        )
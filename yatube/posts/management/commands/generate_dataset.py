@@ -0,0 +1,274 @@
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from faker import Faker
+from PIL import Image
+
+from posts.bulk import deferred_indexes, next_id, preserved_timestamps
+from posts.cache import bump_posts_version
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+DEFAULT_UNTIL = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+CHUNK_SIZE = 50000
+
+IMAGE_COUNT = 16
+
+
+def power_law_weights(size, alpha):
+    """Накопленные веса распределения Ципфа для rng.choices."""
+    return list(accumulate(1 / (rank ** alpha) for rank in range(1, size + 1)))
+
+
+@contextmanager
+def fast_sqlite_writes():
+    """Отключает fsync SQLite на время генерации одноразовых данных."""
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous = OFF')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA synchronous = {int(synchronous)}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетический набор данных заданного размера: '
+        'пользователей, группы, посты с картинками, комментарии и '
+        'подписки со степенным распределением активности. Результат '
+        'однозначно определяется --seed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=1.1,
+            help='Показатель степенного распределения активности',
+        )
+        parser.add_argument(
+            '--image-ratio',
+            type=float,
+            default=0.1,
+            help='Доля постов с картинкой',
+        )
+        parser.add_argument('--days', type=int, default=3 * 365)
+        parser.add_argument('--batch-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['seed'])
+        self.words = sorted(set(fake.words(nb=5000)))
+        self.first_names = sorted({fake.first_name() for _ in range(300)})
+        self.last_names = sorted({fake.last_name() for _ in range(300)})
+        self.alpha = options['alpha']
+        self.batch_size = options['batch_size']
+        self.until = DEFAULT_UNTIL
+        self.since = self.until - timedelta(days=options['days'])
+        started = time.monotonic()
+        with fast_sqlite_writes(), preserved_timestamps(), \
+                deferred_indexes():
+            users = self.timed('users', self.create_users, options['users'])
+            groups = self.timed(
+                'groups', self.create_groups, options['groups']
+            )
+            images = self.create_images(options['seed'])
+            posts = self.timed(
+                'posts',
+                self.create_posts,
+                options['posts'],
+                users,
+                groups,
+                images,
+                options['image_ratio'],
+            )
+            self.timed(
+                'comments',
+                self.create_comments,
+                options['comments'],
+                users,
+                posts,
+            )
+            self.timed(
+                'follows', self.create_follows, options['follows'], users
+            )
+        bump_posts_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} c'
+        ))
+
+    def timed(self, name, method, count, *args):
+        started = time.monotonic()
+        result = method(count, *args)
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(
+            f'{name}: {count} за {elapsed:.1f} c ({count / elapsed:.0f}/с)'
+        )
+        return result
+
+    def text(self, low, high):
+        return ' '.join(self.rng.choices(self.words, k=self.rng.randint(
+            low, high
+        ))).capitalize()
+
+    def chunks(self, count):
+        for start in range(0, count, self.batch_size):
+            yield start, min(self.batch_size, count - start)
+
+    def popular(self, ids):
+        """Перемешивает id, чтобы популярность не совпадала с порядком."""
+        ids = list(ids)
+        self.rng.shuffle(ids)
+        return ids, power_law_weights(len(ids), self.alpha)
+
+    def create_users(self, count):
+        first_id = next_id(User)
+        password = make_password(None)
+        for start, size in self.chunks(count):
+            users = [
+                User(
+                    id=first_id + number,
+                    username=f'user{first_id + number}',
+                    first_name=self.rng.choice(self.first_names),
+                    last_name=self.rng.choice(self.last_names),
+                    password=password,
+                )
+                for number in range(start, start + size)
+            ]
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+        return range(first_id, first_id + count)
+
+    def create_groups(self, count):
+        first_id = next_id(Group)
+        groups = [
+            Group(
+                id=first_id + number,
+                title=self.text(1, 3),
+                slug=f'group-{first_id + number}',
+                description=self.text(5, 20),
+            )
+            for number in range(count)
+        ]
+        Group.objects.bulk_create(groups)
+        return range(first_id, first_id + count)
+
+    def create_images(self, seed):
+        directory = os.path.join(settings.MEDIA_ROOT, 'posts')
+        os.makedirs(directory, exist_ok=True)
+        names = []
+        for number in range(IMAGE_COUNT):
+            name = f'posts/synthetic_{seed}_{number}.jpg'
+            path = os.path.join(settings.MEDIA_ROOT, name)
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            if not os.path.exists(path):
+                Image.new('RGB', (1280, 720), color).save(path, 'JPEG')
+            names.append(name)
+        return names
+
+    def create_posts(self, count, users, groups, images, image_ratio):
+        first_id = next_id(Post)
+        authors, author_weights = self.popular(users)
+        group_ids, group_weights = self.popular(groups)
+        step = (self.until - self.since) / max(count, 1)
+        self.post_dates = (first_id, step)
+        for start, size in self.chunks(count):
+            chosen_authors = self.rng.choices(
+                authors, cum_weights=author_weights, k=size
+            )
+            chosen_groups = self.rng.choices(
+                group_ids, cum_weights=group_weights, k=size
+            ) if group_ids else [None] * size
+            posts = []
+            for offset in range(size):
+                number = start + offset
+                has_group = group_ids and self.rng.random() < 0.8
+                has_image = images and self.rng.random() < image_ratio
+                posts.append(Post(
+                    id=first_id + number,
+                    text=self.text(5, 60),
+                    pub_date=self.since + step * number,
+                    author_id=chosen_authors[offset],
+                    group_id=chosen_groups[offset] if has_group else None,
+                    image=self.rng.choice(images) if has_image else '',
+                ))
+            with transaction.atomic():
+                Post.objects.bulk_create(posts)
+        return range(first_id, first_id + count)
+
+    def create_comments(self, count, users, posts):
+        if not posts:
+            return
+        first_id = next_id(Comment)
+        post_ids, post_weights = self.popular(posts)
+        authors, author_weights = self.popular(users)
+        for start, size in self.chunks(count):
+            chosen_posts = self.rng.choices(
+                post_ids, cum_weights=post_weights, k=size
+            )
+            chosen_authors = self.rng.choices(
+                authors, cum_weights=author_weights, k=size
+            )
+            comments = [
+                Comment(
+                    id=first_id + start + offset,
+                    post_id=chosen_posts[offset],
+                    author_id=chosen_authors[offset],
+                    text=self.text(3, 30),
+                    created=self.comment_date(chosen_posts[offset]),
+                )
+                for offset in range(size)
+            ]
+            with transaction.atomic():
+                Comment.objects.bulk_create(comments)
+
+    def comment_date(self, post_id):
+        first_id, step = self.post_dates
+        pub_date = self.since + step * (post_id - first_id)
+        return pub_date + (self.until - pub_date) * self.rng.random()
+
+    def create_follows(self, count, users):
+        if len(users) < 2:
+            return
+        authors, author_weights = self.popular(users)
+        count = min(count, len(users) * (len(users) - 1))
+        seen = set()
+        while len(seen) < count:
+            size = min(self.batch_size, count - len(seen))
+            followers = self.rng.choices(users, k=size)
+            chosen = self.rng.choices(
+                authors, cum_weights=author_weights, k=size
+            )
+            follows = []
+            for user_id, author_id in zip(followers, chosen):
+                pair = (user_id, author_id)
+                if user_id == author_id or pair in seen:
+                    continue
+                seen.add(pair)
+                follows.append(Follow(user_id=user_id, author_id=author_id))
+            with transaction.atomic():
+                Follow.objects.bulk_create(follows)
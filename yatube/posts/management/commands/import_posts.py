@@ -0,0 +1,204 @@
+import gzip
+import json
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts.bulk import (deferred_indexes, next_id, parse_timestamp,
+                        preserved_timestamps)
+from posts.cache import bump_posts_version
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+MODELS = ('user', 'group', 'post', 'comment', 'follow')
+
+REPORT_EVERY = 100000
+
+
+def open_input(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+class Command(BaseCommand):
+    help = (
+        'Массово загружает пользователей, группы, посты, комментарии '
+        'и подписки из NDJSON. Каждая строка — объект с полем "model" '
+        '(user, group, post, comment, follow); ссылки на другие объекты '
+        'задаются их id из исходной системы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Файлы NDJSON или -')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--keep-indexes',
+            action='store_true',
+            help='Не снимать вторичные индексы на время загрузки',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.buffers = {model: [] for model in MODELS}
+        self.counts = {model: 0 for model in MODELS}
+        self.users = {}
+        self.groups = {}
+        self.posts = {}
+        self.next_post_id = next_id(Post)
+        self.next_comment_id = next_id(Comment)
+        self.next_user_id = next_id(User)
+        self.next_group_id = next_id(Group)
+        self.started = time.monotonic()
+        self.reported = 0
+        indexes = deferred_indexes()
+        if options['keep_indexes']:
+            indexes = deferred_indexes(())
+        with preserved_timestamps(), indexes:
+            for path in options['paths']:
+                with open_input(path) as lines:
+                    self.load(lines)
+            for model in MODELS:
+                self.flush(model)
+        bump_posts_version()
+        total = sum(self.counts.values())
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {total} строк за {elapsed:.1f} c '
+            f'({total / max(elapsed, 1e-9):.0f} строк/с): '
+            + ', '.join(f'{model} {count}' for model, count
+                        in self.counts.items())
+        ))
+
+    def load(self, lines):
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                model = record['model']
+            except (ValueError, KeyError):
+                raise CommandError(f'Строка {number}: некорректная запись')
+            if model not in self.buffers:
+                raise CommandError(f'Строка {number}: неизвестная модель')
+            for previous in MODELS[:MODELS.index(model)]:
+                self.flush(previous)
+            buffer = self.buffers[model]
+            buffer.append(record)
+            if len(buffer) >= self.batch_size:
+                self.flush(model)
+
+    def flush(self, model):
+        records = self.buffers[model]
+        if not records:
+            return
+        self.buffers[model] = []
+        try:
+            with transaction.atomic():
+                getattr(self, f'flush_{model}')(records)
+        except (KeyError, ValueError) as error:
+            raise CommandError(f'Ошибка в данных {model}: {error!r}')
+        self.counts[model] += len(records)
+        self.report()
+
+    def report(self):
+        total = sum(self.counts.values())
+        if total - self.reported < REPORT_EVERY:
+            return
+        self.reported = total
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'{total} строк, {total / max(elapsed, 1e-9):.0f} строк/с'
+        )
+
+    def flush_user(self, records):
+        existing = dict(User.objects.filter(
+            username__in=[record['username'] for record in records]
+        ).values_list('username', 'id'))
+        new_users = []
+        for record in records:
+            user_id = existing.get(record['username'])
+            if user_id is None:
+                user_id = self.next_user_id
+                self.next_user_id += 1
+                existing[record['username']] = user_id
+                new_users.append(User(
+                    id=user_id,
+                    username=record['username'],
+                    email=record.get('email', ''),
+                    first_name=record.get('first_name', ''),
+                    last_name=record.get('last_name', ''),
+                    password=make_password(None),
+                    date_joined=parse_timestamp(record.get('date_joined')),
+                ))
+            self.users[record['id']] = user_id
+        User.objects.bulk_create(new_users, batch_size=self.batch_size)
+
+    def flush_group(self, records):
+        existing = dict(Group.objects.filter(
+            slug__in=[record['slug'] for record in records]
+        ).values_list('slug', 'id'))
+        new_groups = []
+        for record in records:
+            group_id = existing.get(record['slug'])
+            if group_id is None:
+                group_id = self.next_group_id
+                self.next_group_id += 1
+                existing[record['slug']] = group_id
+                new_groups.append(Group(
+                    id=group_id,
+                    title=record['title'],
+                    slug=record['slug'],
+                    description=record.get('description', ''),
+                ))
+            self.groups[record['id']] = group_id
+        Group.objects.bulk_create(new_groups, batch_size=self.batch_size)
+
+    def flush_post(self, records):
+        posts = []
+        for record in records:
+            group = record.get('group')
+            posts.append(Post(
+                id=self.next_post_id,
+                text=record['text'],
+                pub_date=parse_timestamp(record.get('pub_date')),
+                author_id=self.users[record['author']],
+                group_id=self.groups[group] if group is not None else None,
+                image=record.get('image', ''),
+            ))
+            self.posts[record['id']] = self.next_post_id
+            self.next_post_id += 1
+        Post.objects.bulk_create(posts, batch_size=self.batch_size)
+
+    def flush_comment(self, records):
+        comments = []
+        for record in records:
+            author = record.get('author')
+            comments.append(Comment(
+                id=self.next_comment_id,
+                post_id=self.posts[record['post']],
+                author_id=self.users[author] if author is not None else None,
+                text=record['text'],
+                created=parse_timestamp(record.get('created')),
+            ))
+            self.next_comment_id += 1
+        Comment.objects.bulk_create(comments, batch_size=self.batch_size)
+
+    def flush_follow(self, records):
+        Follow.objects.bulk_create(
+            [
+                Follow(
+                    user_id=self.users[record['user']],
+                    author_id=self.users[record['author']],
+                )
+                for record in records
+            ],
+            batch_size=self.batch_size,
+        )
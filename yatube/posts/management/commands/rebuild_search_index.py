@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.search import fts_enabled, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовые индексы постов и комментариев '
+        'по текущим данным'
+    )
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            self.stdout.write(
+                'Полнотекстовый индекс доступен только для SQLite'
+            )
+            return
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен'))
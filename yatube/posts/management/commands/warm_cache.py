@@ -0,0 +1,198 @@
+import json
+import random
+import re
+import threading
+import time
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import Resolver404, resolve, reverse
+
+from posts.models import Group, Post
+
+# Представления с кешем страниц. Главная лежит под обычным cache_page
+# на CACHE_TIME секунд, и прогрев кладёт её под тот же ключ, что он
+# читает; страницы групп и постов — под versioned_cache_page и живут
+# до нового поста.
+WARMED_VIEWS = ('posts:index', 'posts:group_list', 'posts:post_detail')
+
+# Запрос из access log в формате common/combined: "GET /path HTTP/1.1" 200
+ACCESS_LINE = re.compile(
+    r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+" 200 '
+)
+
+
+def log_paths(lines, sample=1.0, rng=random):
+    """Адреса успешных GET-запросов из access log или JSON-логов
+    yatube.timing / памяти, с долей выборки sample.
+    """
+    for line in lines:
+        if sample < 1 and rng.random() >= sample:
+            continue
+        if line.startswith('{'):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            method, path = entry.get('method', 'GET'), entry.get('path')
+            if entry.get('status') != 200:
+                continue
+        else:
+            match = ACCESS_LINE.search(line)
+            if match is None:
+                continue
+            method, path = match.group('method', 'path')
+        if method == 'GET' and path:
+            yield path
+
+
+def is_warmed(path):
+    try:
+        match = resolve(path.split('?', 1)[0])
+    except Resolver404:
+        return False
+    return match.view_name in WARMED_VIEWS
+
+
+def default_paths(options):
+    """Первые страницы главной и крупнейших групп и посты с наибольшим
+    числом комментариев."""
+    index = reverse('posts:index')
+    paths = [
+        f'{index}?page={page}' if page > 1 else index
+        for page in range(1, options['index_pages'] + 1)
+    ]
+    slugs = Group.objects.annotate(size=Count('posts')).order_by(
+        '-size'
+    ).values_list('slug', flat=True)[:options['groups']]
+    for slug in slugs:
+        url = reverse('posts:group_list', args=(slug,))
+        paths.extend(
+            f'{url}?page={page}' if page > 1 else url
+            for page in range(1, options['group_pages'] + 1)
+        )
+    post_ids = Post.objects.annotate(size=Count('comments')).order_by(
+        '-size', '-pub_date'
+    ).values_list('id', flat=True)[:options['posts']]
+    paths.extend(
+        reverse('posts:post_detail', args=(post_id,)) for post_id in post_ids
+    )
+    return paths
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет кеш страниц после деплоя или сброса: первые страницы '
+        'главной, крупнейшие группы и самые обсуждаемые посты (по числу '
+        'комментариев: просмотры не хранятся) либо самые частые адреса '
+        'главной, групп и постов из access log. Главная живёт в кеше '
+        'всего CACHE_TIME секунд, поэтому прогревать её стоит прямо '
+        'перед тем, как пустить трафик. Без --base-url страницы строятся '
+        'в этом процессе под --scheme и --host, что имеет смысл только '
+        'с общим бэкендом CACHES.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--index-pages', type=int, default=5)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--group-pages', type=int, default=2)
+        parser.add_argument(
+            '--posts', type=int, default=50,
+            help='Сколько постов с наибольшим числом комментариев прогреть',
+        )
+        parser.add_argument(
+            '--log', help='Access log или JSON-лог; адреса берутся из него'
+        )
+        parser.add_argument(
+            '--sample', type=float, default=1.0,
+            help='Доля строк лога для разбора',
+        )
+        parser.add_argument(
+            '--top', type=int, default=200,
+            help='Сколько самых частых адресов лога прогреть',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Одновременных запросов, чтобы не перегрузить БД',
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Прогревать запросами к запущенному сайту, например '
+                 'http://127.0.0.1:8000',
+        )
+        parser.add_argument(
+            '--host',
+            help='Host, под которым страницы лягут в кеш; обязателен '
+                 'без --base-url',
+        )
+        parser.add_argument(
+            '--scheme', choices=('https', 'http'), default='https',
+            help='Схема адресов сайта: она входит в ключ кеша страниц',
+        )
+
+    def handle(self, *args, **options):
+        if options['log']:
+            try:
+                with open(options['log'], encoding='utf-8') as source:
+                    counts = Counter(filter(
+                        is_warmed, log_paths(source, options['sample'])
+                    ))
+            except FileNotFoundError:
+                raise CommandError(f'Лог {options["log"]} не найден')
+            paths = [path for path, _ in counts.most_common(options['top'])]
+        else:
+            paths = default_paths(options)
+        if options['base_url']:
+            fetch = self.remote_fetcher(options['base_url'])
+        elif options['host']:
+            fetch = self.local_fetcher(
+                options['host'], options['scheme'] == 'https'
+            )
+        else:
+            raise CommandError(
+                'Укажите --host, под которым сайт открывают посетители, '
+                'или --base-url'
+            )
+        started = time.monotonic()
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(options['workers']) as pool:
+                statuses = list(pool.map(fetch, paths))
+        else:
+            statuses = [fetch(path) for path in paths]
+        summary = ', '.join(
+            f'{status}: {count}'
+            for status, count in sorted(Counter(map(str, statuses)).items())
+        )
+        self.stdout.write(
+            f'Прогрето {len(paths)} адресов за '
+            f'{time.monotonic() - started:.1f} c ({summary})'
+        )
+
+    def local_fetcher(self, host, secure):
+        def fetch(path):
+            try:
+                return Client(HTTP_HOST=host).get(
+                    path, secure=secure
+                ).status_code
+            finally:
+                # Соединения потоков пула иначе остаются открытыми.
+                if threading.current_thread() is not threading.main_thread():
+                    connections.close_all()
+        return fetch
+
+    def remote_fetcher(self, base_url):
+        def fetch(path):
+            try:
+                with urllib.request.urlopen(base_url + path, timeout=30) as r:
+                    return r.status
+            except HTTPError as error:
+                return error.code
+            except URLError:
+                return 'error'
+        return fetch
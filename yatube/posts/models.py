@@ -13,6 +13,11 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def feed(self):
+        return self.select_related('author', 'group')
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст поста',
@@ -47,11 +52,32 @@ class Post(models.Model):
         blank=True
     )
 
+    version = models.PositiveIntegerField(
+        'Версия',
+        default=1,
+        editable=False,
+        help_text='Растёт при каждой правке; защищает от перезаписи '
+                  'одновременных правок',
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    is_archived = False
+
     def __str__(self):
         return self.text[:15]
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['pub_date'], name='post_pub_date_idx'),
+            models.Index(
+                fields=['author', '-pub_date'], name='post_author_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date'], name='post_group_date_idx'
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -75,8 +101,86 @@ class Comment(models.Model):
         verbose_name='Дата публикации',
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created'], name='comment_created_idx'),
+            models.Index(
+                fields=['post', '-created'], name='comment_post_date_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Запись: '{self.post}', автор: '{self.author}'"
+
+
+class ArchivedPost(models.Model):
+    """Пост, перенесённый из posts_post командой archive_posts.
+
+    id совпадает с исходным, поэтому ссылки на пост не меняются.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор',
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа',
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+
+    objects = PostQuerySet.as_manager()
+
+    is_archived = True
+
+    def __str__(self):
+        return self.text[:15]
+
+    class Meta:
+        ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='archived_author_date_idx',
+            ),
+            models.Index(
+                fields=['group', '-pub_date'], name='archived_group_date_idx'
+            ),
+        ]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    author = models.ForeignKey(
+        User,
+        related_name='archived_comments',
+        on_delete=models.SET_NULL,
+        null=True
+    )
+    text = models.TextField(verbose_name='Текст комментария')
+    created = models.DateTimeField(verbose_name='Дата публикации')
+
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['post', '-created'], name='archived_comment_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Запись: '{self.post}', автор: '{self.author}'"
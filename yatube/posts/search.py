@@ -0,0 +1,169 @@
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from . import utils
+
+FTS_TABLE = 'posts_post_fts'
+COMMENT_FTS_TABLE = 'posts_comment_fts'
+
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+SearchPage = namedtuple('SearchPage', ('posts', 'next_cursor'))
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(query):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, поэтому операторы и спецсимволы
+    FTS5 из строки поиска не могут сломать запрос.
+    """
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', query))
+
+
+def encode_cursor(rank, post_id):
+    return utils.encode_cursor(repr(rank), post_id)
+
+
+def decode_cursor(cursor):
+    return utils.decode_cursor(cursor, float, int)
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def filter_text(queryset, query, table):
+    """Ограничивает queryset строками, чей text найден в индексе table."""
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    if not fts_enabled():
+        return queryset.filter(text__icontains=query)
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {table} WHERE {table} MATCH %s', (match,)
+    ))
+
+
+def filter_posts(queryset, query):
+    """Ограничивает queryset постами, найденными полнотекстовым поиском."""
+    return filter_text(queryset, query, FTS_TABLE)
+
+
+def filter_comments(queryset, query):
+    """Ограничивает queryset комментариями, найденными по их тексту."""
+    return filter_text(queryset, query, COMMENT_FTS_TABLE)
+
+
+def search_posts(query, group=None, author=None, cursor=None, limit=None):
+    """Возвращает страницу результатов, отсортированных по bm25.
+
+    Пагинация курсорная: курсор хранит ранг и id последнего поста,
+    поэтому стоимость следующей страницы не зависит от её номера.
+    Ранг bm25 зависит от статистики всего индекса, и если между
+    запросами страниц посты добавили, изменили или удалили, ранги
+    сдвигаются: строки на границе страниц могут пропасть или
+    повториться. Для поиска это допустимо; стабильный порядок дал бы
+    только снимок выдачи.
+    """
+    limit = limit or settings.PAGE_COUNT
+    match = build_match_query(query)
+    if not match:
+        return SearchPage([], None)
+    if not fts_enabled():
+        return _search_fallback(query, group, author, cursor, limit)
+    filters = []
+    params = [match]
+    if group is not None:
+        filters.append('AND p.group_id = %s')
+        params.append(group.pk)
+    if author is not None:
+        filters.append('AND p.author_id = %s')
+        params.append(author.pk)
+    after = ''
+    if cursor:
+        rank, post_id = decode_cursor(cursor)
+        after = 'WHERE rank > %s OR (rank = %s AND id > %s)'
+        params.extend((rank, rank, post_id))
+    params.append(limit + 1)
+    sql = f"""
+        SELECT id, rank, snippet FROM (
+            SELECT p.id AS id,
+                   bm25({FTS_TABLE}) AS rank,
+                   snippet({FTS_TABLE}, 0, char(2), char(3), '…', 24)
+                       AS snippet
+            FROM {FTS_TABLE}
+            JOIN posts_post p ON p.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s {' '.join(filters)}
+        ) {after}
+        ORDER BY rank, id
+        LIMIT %s
+    """
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        rows = db_cursor.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+    posts = Post.objects.feed().in_bulk(
+        [row[0] for row in rows]
+    )
+    results = []
+    for post_id, rank, snippet in rows:
+        post = posts.get(post_id)
+        if post is None:
+            continue
+        post.rank = rank
+        post.snippet = highlight(snippet)
+        results.append(post)
+    return SearchPage(results, next_cursor)
+
+
+def _search_fallback(query, group, author, cursor, limit):
+    queryset = Post.objects.feed().filter(
+        text__icontains=query
+    ).order_by('id')
+    if group is not None:
+        queryset = queryset.filter(group=group)
+    if author is not None:
+        queryset = queryset.filter(author=author)
+    if cursor:
+        queryset = queryset.filter(id__gt=decode_cursor(cursor)[1])
+    posts = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(0.0, posts[-1].id)
+    for post in posts:
+        post.rank = 0.0
+        post.snippet = escape(post.text[:200])
+    return SearchPage(posts, next_cursor)
+
+
+def rebuild_index():
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        for table in (FTS_TABLE, COMMENT_FTS_TABLE):
+            cursor.execute(
+                f"INSERT INTO {table}({table}) VALUES ('rebuild')"
+            )
+            cursor.execute(
+                f"INSERT INTO {table}({table}) VALUES ('optimize')"
+            )
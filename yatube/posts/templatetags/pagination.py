@@ -0,0 +1,11 @@
+from django import template
+
+from ..utils import elided_page_range
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_range(page_obj):
+    """Номера страниц для paginator.html; пропуски обозначены ELLIPSIS."""
+    return list(elided_page_range(page_obj.paginator, page_obj.number))
@@ -0,0 +1,35 @@
+from django import template
+from django.urls import reverse
+
+register = template.Library()
+
+
+def post_row(post, author_link, group_link):
+    """Всё, что нужно шаблону статьи, одним словарём: связанные
+    объекты и адреса разбираются здесь, а не поиском атрибутов
+    и {% url %} в шаблоне.
+    """
+    row = {
+        'text': post.text,
+        'pub_date': post.pub_date,
+        'image': post.image,
+        'detail_url': reverse('posts:post_detail', args=(post.id,)),
+    }
+    if group_link and post.group_id:
+        row['group_title'] = post.group.title
+        row['group_url'] = reverse('posts:group_list', args=(post.group.slug,))
+    if author_link:
+        row['author_name'] = post.author.get_full_name()
+        row['author_url'] = reverse(
+            'posts:profile', args=(post.author.username,)
+        )
+    return row
+
+
+@register.simple_tag
+def post_rows(posts, author_link=False, group_link=False):
+    """Строки ленты для posts/includes/post_row.html.
+
+    Даёт тот же HTML, что posts/includes/article.html для каждого поста.
+    """
+    return [post_row(post, author_link, group_link) for post in posts]
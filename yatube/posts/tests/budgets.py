@@ -0,0 +1,29 @@
+from ..urls import app_name
+
+# Бюджет SQL-запросов каждого адреса с учётом сессии и пользователя
+# при холодном кеше; проверяется через core.query_budget.BudgetClient.
+QUERY_BUDGETS = {f'{app_name}:{name}': queries for name, queries in {
+    'index': 4,
+    'group_list': 5,
+    'search': 5,
+    'post_create': 2,
+    'post_edit': 4,
+    'profile': 5,
+    'profile_export': 5,
+    'post_detail': 5,
+    'add_comment': 4,
+    'follow_index': 2,
+    'profile_follow': 4,
+    'profile_unfollow': 2,
+    'index_rss': 1,
+    'index_atom': 1,
+    'group_rss': 2,
+    'group_atom': 2,
+    'profile_rss': 2,
+    'profile_atom': 2,
+    'api_index': 1,
+    'api_group_list': 2,
+    'api_profile': 2,
+    'api_post_detail': 1,
+    'api_comments': 2,
+}.items()}
@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.core.paginator import EmptyPage
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+from ..utils import EstimatedCountPaginator
+
+User = get_user_model()
+
+
+class AdminChangelistTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(30):
+            author = User.objects.create_user(username=f'user{i}')
+            post = Post.objects.create(
+                author=author, text=f'Тестовый пост {i}', group=cls.group
+            )
+            Comment.objects.create(post=post, author=author, text='Коммент')
+            Follow.objects.create(user=author, author=cls.admin)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_changelists_query_count_does_not_grow(self):
+        """Список объектов в админке не делает запрос на каждую строку.
+
+        Сессия и пользователь читаются из кеша, поэтому остаются
+        только COUNT и выборка строк.
+        """
+        self.client.get(reverse('admin:index'))
+        for model in ('post', 'comment', 'follow'):
+            url = reverse(f'admin:posts_{model}_changelist')
+            with self.subTest(model=model):
+                with self.assertNumQueries(2):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_search_by_username(self):
+        """Поиск комментариев идёт по точному имени пользователя."""
+        response = self.client.get(
+            reverse('admin:posts_comment_changelist'), {'q': 'user3'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_search_by_comment_text(self):
+        """Комментарии находятся по своему тексту через индекс."""
+        comment = Comment.objects.first()
+        comment.text = 'Жирафы тоже комментируют'
+        comment.save()
+        response = self.client.get(
+            reverse('admin:posts_comment_changelist'), {'q': 'жирафы'}
+        )
+        self.assertEqual(list(response.context['cl'].result_list), [comment])
+
+    def test_estimated_count(self):
+        """Оценка без фильтров берётся по MIN(id) и MAX(id),
+        с фильтром — точная."""
+        posts = Post.objects.order_by('id')
+        self.assertEqual(
+            EstimatedCountPaginator(posts, 10).count,
+            posts.last().id - posts.first().id + 1,
+        )
+        self.assertEqual(
+            EstimatedCountPaginator(
+                Post.objects.filter(author__username='user1'), 10
+            ).count,
+            1,
+        )
+
+    def test_estimate_clamped_after_deletions(self):
+        """Оценка, завышенная удалениями, уточняется на последней
+        странице, и пустых страниц в конце не остаётся."""
+        ids = list(Post.objects.order_by('id').values_list('id', flat=True))
+        Post.objects.filter(id__in=ids[5:15]).delete()
+        paginator = EstimatedCountPaginator(Post.objects.order_by('id'), 10)
+        self.assertEqual(paginator.num_pages, 3)
+        page = paginator.page(2)
+        self.assertEqual(len(page), 10)
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.count, 20)
+        with self.assertRaises(EmptyPage):
+            EstimatedCountPaginator(Post.objects.order_by('id'), 10).page(3)
+
+    def test_changelist_shows_clamped_count(self):
+        """Список в админке показывает уточнённое число строк."""
+        ids = list(Post.objects.order_by('id').values_list('id', flat=True))
+        Post.objects.filter(id__in=ids[:10]).delete()
+        Post.objects.filter(id__in=ids[15:25]).delete()
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertEqual(response.context['cl'].result_count, 10)
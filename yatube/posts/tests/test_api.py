@@ -0,0 +1,125 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с картинкой',
+            group=cls.group,
+            image=SimpleUploadedFile(
+                name='small.gif', content=small_gif, content_type='image/gif'
+            ),
+        )
+        for i in range(12):
+            Post.objects.create(
+                author=cls.user, text=f'Тестовый пост {i}', group=cls.group
+            )
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Коммент {i}'
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def collect(self, url, **params):
+        ids = []
+        while url:
+            data = self.guest_client.get(url, params).json()
+            params = {}
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    def test_feeds_cursor_pagination(self):
+        """Курсор обходит ленты целиком в порядке убывания даты."""
+        expected = list(
+            Post.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=(self.group.slug,)),
+            reverse('posts:api_profile', args=(self.user.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.collect(url, limit=5), expected)
+
+    def test_sparse_fields(self):
+        """Клиент получает только запрошенные поля."""
+        data = self.guest_client.get(
+            reverse('posts:api_post_detail', args=(self.post.id,)),
+            {'fields': 'text,thumbnail'},
+        ).json()
+        self.assertEqual(set(data), {'text', 'thumbnail'})
+        self.assertEqual(data['text'], self.post.text)
+        self.assertTrue(data['thumbnail'].startswith(settings.MEDIA_URL))
+
+    def test_unknown_field(self):
+        response = self.guest_client.get(
+            reverse('posts:api_index'), {'fields': 'password'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_bad_cursor(self):
+        response = self.guest_client.get(
+            reverse('posts:api_index'), {'cursor': 'мусор'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_comments(self):
+        """Комментарии поста отдаются от новых к старым."""
+        url = reverse('posts:api_comments', args=(self.post.id,))
+        self.assertEqual(
+            self.collect(url, limit=2),
+            list(
+                self.post.comments.order_by('-created', '-id')
+                .values_list('id', flat=True)
+            ),
+        )
+
+    def test_not_found(self):
+        response = self.guest_client.get(
+            reverse('posts:api_profile', args=('nobody',))
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json())
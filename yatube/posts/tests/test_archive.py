@@ -0,0 +1,177 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..bulk import next_id, preserved_timestamps
+from ..export import export_stream
+from ..models import ArchivedComment, ArchivedPost, Comment, Group, Post
+
+User = get_user_model()
+
+OLD_POSTS = 5
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        now = timezone.now()
+        with preserved_timestamps():
+            Post.objects.bulk_create(
+                Post(
+                    author=cls.user,
+                    group=cls.group,
+                    text=f'Старый пост {number}',
+                    pub_date=now - timedelta(days=400 + number),
+                )
+                for number in range(OLD_POSTS)
+            )
+            Post.objects.bulk_create(
+                Post(
+                    author=cls.user,
+                    group=cls.group,
+                    text=f'Новый пост {number}',
+                    pub_date=now - timedelta(hours=number),
+                )
+                for number in range(settings.PAGE_COUNT)
+            )
+        cls.old_post = Post.objects.get(text='Старый пост 0')
+        Comment.objects.create(
+            post=cls.old_post, author=cls.user, text='Старый комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def archive(self, **options):
+        out = StringIO()
+        call_command('archive_posts', stdout=out, **options)
+        return out.getvalue()
+
+    def test_command_moves_old_posts(self):
+        """Старые посты и их комментарии переезжают в архив."""
+        self.archive(batch_size=2)
+        self.assertEqual(ArchivedPost.objects.count(), OLD_POSTS)
+        self.assertEqual(Post.objects.count(), settings.PAGE_COUNT)
+        self.assertFalse(Comment.objects.exists())
+        archived = ArchivedPost.objects.get(id=self.old_post.id)
+        self.assertEqual(archived.text, self.old_post.text)
+        self.assertEqual(archived.pub_date, self.old_post.pub_date)
+        self.assertEqual(
+            archived.comments.get().text, 'Старый комментарий'
+        )
+
+    def test_dry_run(self):
+        """--dry-run только считает посты к переносу."""
+        output = self.archive(dry_run=True)
+        self.assertIn(f'К переносу {OLD_POSTS} постов', output)
+        self.assertFalse(ArchivedPost.objects.exists())
+
+    def test_pages_continue_into_archive(self):
+        """Профиль и группа показывают архив на дальних страницах."""
+        self.archive()
+        pages = (
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:group_list', args=(self.group.slug,)),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                first = self.authorized_client.get(page)
+                self.assertEqual(
+                    first.context['page_obj'].paginator.count,
+                    settings.PAGE_COUNT + OLD_POSTS,
+                )
+                self.assertNotContains(first, 'Старый пост')
+                second = self.authorized_client.get(page, {'page': 2})
+                texts = [
+                    post.text for post in second.context['page_obj']
+                ]
+                self.assertEqual(
+                    texts,
+                    [f'Старый пост {number}' for number in range(OLD_POSTS)],
+                )
+
+    def test_archived_post_detail(self):
+        """Архивный пост открывается без формы комментария и правки."""
+        self.archive()
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', args=(self.old_post.id,))
+        )
+        self.assertContains(response, 'Старый комментарий')
+        self.assertNotContains(
+            response,
+            reverse('posts:post_edit', args=(self.old_post.id,)),
+        )
+        self.assertNotContains(
+            response,
+            reverse('posts:add_comment', args=(self.old_post.id,)),
+        )
+
+    def test_archived_post_is_read_only(self):
+        """Комментировать и править архивный пост нельзя."""
+        self.archive()
+        for name in ('posts:add_comment', 'posts:post_edit'):
+            with self.subTest(name=name):
+                response = self.authorized_client.post(
+                    reverse(name, args=(self.old_post.id,)),
+                    {'text': 'Текст'},
+                )
+                self.assertEqual(response.status_code, 404)
+        self.assertEqual(ArchivedComment.objects.count(), 1)
+
+    def test_api_reads_archive(self):
+        """API отдаёт архивные посты и их комментарии."""
+        self.archive()
+        response = self.authorized_client.get(
+            reverse('posts:api_post_detail', args=(self.old_post.id,))
+        )
+        self.assertEqual(response.json()['text'], self.old_post.text)
+        response = self.authorized_client.get(
+            reverse('posts:api_comments', args=(self.old_post.id,))
+        )
+        self.assertEqual(
+            response.json()['results'][0]['text'], 'Старый комментарий'
+        )
+        response = self.authorized_client.get(
+            reverse('posts:api_profile', args=(self.user.username,)),
+            {'limit': 100},
+        )
+        self.assertEqual(
+            len(response.json()['results']), settings.PAGE_COUNT + OLD_POSTS
+        )
+
+    def test_export_includes_archive(self):
+        """Полная выгрузка автора содержит и архивные строки."""
+        self.archive()
+        rows = [
+            json.loads(line)
+            for line in b''.join(export_stream(self.user)).splitlines()
+        ]
+        posts = [row['id'] for row in rows if row['type'] == 'post']
+        self.assertEqual(len(posts), settings.PAGE_COUNT + OLD_POSTS)
+        self.assertEqual(posts, sorted(posts))
+        comment, = [row for row in rows if row['type'] == 'comment']
+        self.assertEqual(comment['text'], 'Старый комментарий')
+
+    def test_next_id_skips_archived_ids(self):
+        """Новые id не повторяют id, уже перенесённые в архив."""
+        self.archive()
+        Post.objects.all().delete()
+        last_post = ArchivedPost.objects.order_by('-id').first().id
+        last_comment = ArchivedComment.objects.get().id
+        Comment.objects.all().delete()
+        self.assertEqual(next_id(Post), last_post + 1)
+        self.assertEqual(next_id(Comment), last_comment + 1)
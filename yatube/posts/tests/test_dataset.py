@@ -0,0 +1,52 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import Comment, Follow, Post
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class GenerateDatasetCommandTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def generate(self):
+        call_command(
+            'generate_dataset',
+            users=50,
+            groups=5,
+            posts=500,
+            comments=300,
+            follows=100,
+            seed=3,
+            batch_size=128,
+            stdout=StringIO(),
+        )
+        return list(Post.objects.order_by('id').values_list(
+            'author_id', 'group_id', 'text', 'image'
+        ))
+
+    def test_dataset_size(self):
+        """Команда создаёт заданное число объектов."""
+        self.generate()
+        self.assertEqual(Post.objects.count(), 500)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertEqual(Follow.objects.count(), 100)
+        self.assertTrue(Post.objects.exclude(image='').exists())
+
+    def test_dataset_is_deterministic(self):
+        """Одинаковый seed даёт одинаковые данные."""
+        first = self.generate()
+        Post.objects.all().delete()
+        second = self.generate()
+        self.assertEqual(
+            [row[2:] for row in first], [row[2:] for row in second]
+        )
@@ -0,0 +1,76 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ProfileExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(5):
+            post = Post.objects.create(
+                author=cls.user, text=f'Пост {i}', group=cls.group
+            )
+            Comment.objects.create(post=post, author=cls.user, text='Ок')
+        Post.objects.create(author=cls.other, text='Чужой пост')
+        cls.url = reverse('posts:profile_export', args=(cls.user.username,))
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_ndjson_export(self):
+        """Выгрузка содержит все посты и комментарии автора."""
+        content = self.read(self.authorized_client.get(self.url))
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        types = [row['type'] for row in rows]
+        self.assertEqual(types.count('post'), 5)
+        self.assertEqual(types.count('comment'), 5)
+        self.assertNotIn('Чужой пост', [row['text'] for row in rows])
+
+    def test_csv_gzip_export(self):
+        """CSV-выгрузка сжимается на лету."""
+        response = self.authorized_client.get(
+            self.url, {'format': 'csv', 'gzip': '1'}
+        )
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        content = gzip.decompress(self.read(response)).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0]['group'], self.group.slug)
+
+    def test_export_forbidden_for_other_users(self):
+        client = Client()
+        client.force_login(self.other)
+        self.assertEqual(client.get(self.url).status_code, 403)
+
+    def test_export_command(self):
+        """Команда export_posts пишет выгрузку в файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.ndjson.gz')
+            call_command('export_posts', 'auth', gzip=True, output=path)
+            with gzip.open(path, 'rt') as export:
+                self.assertEqual(len(export.readlines()), 10)
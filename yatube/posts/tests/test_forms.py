@@ -88,6 +88,7 @@ class PostFormsTest(TestCase):
         post_new_data = {
             'text': 'Другой текст поста',
             'group': self.group.id,
+            'version': self.post.version,
         }
         self.authorized_client.post(
             reverse(
@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from ..models import Comment, Follow, Group, Post
+from ..search import search_posts
+
+User = get_user_model()
+
+RECORDS = (
+    {'model': 'user', 'id': 10, 'username': 'old_author'},
+    {'model': 'user', 'id': 11, 'username': 'auth'},
+    {'model': 'group', 'id': 5, 'title': 'Группа', 'slug': 'old_group'},
+    {'model': 'post', 'id': 100, 'author': 10, 'group': 5,
+     'text': 'Импортированный пост', 'pub_date': '2015-03-01T10:00:00'},
+    {'model': 'post', 'id': 101, 'author': 11, 'text': 'Второй пост',
+     'pub_date': '2016-03-01T10:00:00+00:00'},
+    {'model': 'comment', 'id': 7, 'post': 100, 'author': 11,
+     'text': 'Комментарий', 'created': '2015-03-02T10:00:00'},
+    {'model': 'follow', 'user': 11, 'author': 10},
+)
+
+
+class ImportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def schema(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type IN ('index', 'trigger') ORDER BY name"
+            )
+            return cursor.fetchall()
+
+    def test_import(self):
+        """Импорт сохраняет даты, связи и восстанавливает индексы."""
+        schema = self.schema()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.ndjson')
+            with open(path, 'w') as dump:
+                for record in RECORDS:
+                    dump.write(json.dumps(record) + '\n')
+            call_command('import_posts', path, batch_size=1, stdout=StringIO())
+        post = Post.objects.get(text='Импортированный пост')
+        self.assertEqual(post.pub_date.year, 2015)
+        self.assertEqual(post.author.username, 'old_author')
+        self.assertEqual(post.group, Group.objects.get(slug='old_group'))
+        self.assertEqual(
+            Post.objects.get(text='Второй пост').author, self.user
+        )
+        comment = Comment.objects.get()
+        self.assertEqual((comment.post, comment.author), (post, self.user))
+        self.assertEqual(comment.created.year, 2015)
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=post.author).exists()
+        )
+        self.assertEqual(self.schema(), schema)
+        self.assertEqual(search_posts('импортированный').posts, [post])
@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.object_cache import ObjectCache
+from users.cache import authors
+from ..cache import groups
+from ..models import Group
+
+User = get_user_model()
+
+
+class ObjectCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_read_through(self):
+        """Повторное чтение по slug и username не идёт в БД."""
+        for objects, value, expected in (
+            (groups, 'group', self.group),
+            (authors, 'auth', self.user),
+        ):
+            with self.subTest(value=value):
+                with self.assertNumQueries(1):
+                    self.assertEqual(objects.get(value), expected)
+                with self.assertNumQueries(0):
+                    self.assertEqual(objects.get(value), expected)
+
+    def test_missing_objects_are_cached(self):
+        """404 кешируется и сбрасывается при создании объекта."""
+        with self.assertNumQueries(1):
+            for _ in range(3):
+                with self.assertRaises(Http404):
+                    groups.get_or_404('new')
+        group = Group.objects.create(
+            title='Новая', slug='new', description='Описание'
+        )
+        self.assertEqual(groups.get('new'), group)
+
+    def test_junk_values_make_valid_keys(self):
+        """Мусорные адреса дают допустимые для memcached ключи,
+        и их отсутствие тоже кешируется."""
+        for value in ('с пробелом', 'ctrl\x07', 'x' * 1000):
+            with self.subTest(value=value[:20]):
+                key = groups.key(value)
+                self.assertLessEqual(len(key), 250)
+                self.assertRegex(key, r'^[\x21-\x7e]+$')
+                with self.assertNumQueries(1):
+                    for _ in range(2):
+                        self.assertIsNone(groups.get(value))
+
+    def test_rename_forgets_old_key(self):
+        """После смены slug старый адрес перестаёт находить группу."""
+        groups.get('group')
+        group = Group.objects.get(slug='group')
+        group.slug = 'renamed'
+        group.save()
+        self.assertIsNone(groups.get('group'))
+        self.assertEqual(groups.get('renamed').pk, group.pk)
+
+    def test_change_refreshes_cached_object(self):
+        """Изменение объекта сбрасывает его запись в кеше."""
+        authors.get('auth')
+        user = User.objects.get(username='auth')
+        user.first_name = 'Иван'
+        user.save()
+        self.assertEqual(authors.get('auth').first_name, 'Иван')
+
+    @override_settings(OBJECT_CACHE_L1_SIZE=2)
+    def test_local_cache_is_bounded(self):
+        """Кеш процесса отвечает без общего кеша и хранит не больше
+        OBJECT_CACHE_L1_SIZE объектов.
+        """
+        objects = ObjectCache(Group, 'slug', 'group')
+        for slug in ('group', 'a', 'b'):
+            objects.get(slug)
+        self.assertEqual(len(objects.local.entries), 2)
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertIsNone(objects.get('b'))
+        with self.assertNumQueries(1):
+            self.assertEqual(objects.get('group'), self.group)
+
+    @override_settings(OBJECT_CACHE_L1_SIZE=2)
+    def test_local_cache_returns_copies(self):
+        """Кеш процесса отдаёт каждому запросу свой экземпляр."""
+        objects = ObjectCache(Group, 'slug', 'group')
+        first = objects.get('group')
+        first.title = 'Изменено представлением'
+        cache.clear()
+        with self.assertNumQueries(0):
+            second = objects.get('group')
+        self.assertIsNot(second, first)
+        self.assertEqual(second.title, 'Группа')
+
+    def test_follow_unknown_author(self):
+        """Подписка на несуществующего автора отвечает 404."""
+        client = Client()
+        client.force_login(self.user)
+        for name in ('posts:profile_follow', 'posts:profile_unfollow'):
+            with self.subTest(name=name):
+                response = client.get(reverse(name, args=('nobody',)))
+                self.assertEqual(response.status_code, 404)
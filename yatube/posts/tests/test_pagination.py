@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..utils import ELLIPSIS, elided_page_range
+
+User = get_user_model()
+
+POSTS = 40
+
+
+class ElidedPageRangeTests(TestCase):
+    def pages(self, count, number):
+        return list(elided_page_range(Paginator(range(count), 1), number))
+
+    def test_short_range_is_complete(self):
+        """Немного страниц выводятся все."""
+        self.assertEqual(self.pages(10, 5), list(range(1, 11)))
+
+    def test_long_range_is_elided(self):
+        """Из длинного диапазона остаются края и соседи текущей."""
+        self.assertEqual(self.pages(100000, 50000), [
+            1, 2, ELLIPSIS, *range(49997, 50004), ELLIPSIS, 99999, 100000,
+        ])
+        self.assertEqual(
+            self.pages(100000, 1), [1, 2, 3, 4, ELLIPSIS, 99999, 100000]
+        )
+        self.assertEqual(
+            self.pages(100000, 100000),
+            [1, 2, ELLIPSIS, *range(99997, 100001)],
+        )
+
+    @override_settings(PAGE_COUNT=1)
+    def test_paginator_html_is_bounded(self):
+        """Пагинатор страницы выводит окно номеров, а не все страницы."""
+        user = User.objects.create_user(username='auth')
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(author=user, group=group, text=f'Пост {number}')
+            for number in range(POSTS)
+        )
+        cache.clear()
+        response = Client().get(
+            reverse('posts:group_list', args=(group.slug,)), {'page': 20}
+        )
+        self.assertContains(response, ELLIPSIS, count=2)
+        self.assertContains(response, f'?page={POSTS}"')
+        self.assertNotContains(response, '?page=10"')
+        self.assertContains(response, 'page-item', count=17)
@@ -0,0 +1,141 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..search import search_posts
+from ..views import EDIT_CONFLICT
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostEditTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=self.user,
+            group=self.group,
+            text='Старый текст',
+            image=SimpleUploadedFile('old.gif', SMALL_GIF, 'image/gif'),
+        )
+        self.url = reverse('posts:post_edit', args=(self.post.id,))
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def edit(self, **data):
+        data = dict(
+            {'text': self.post.text, 'group': self.group.id, 'version': 1},
+            **data,
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, data)
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "posts_post"')
+        ]
+        return response, updates
+
+    def test_form_posts_to_edit_url(self):
+        """Форма правки отправляется на адрес правки, а не создания."""
+        response = self.client.get(self.url)
+        self.assertContains(response, f'action="{self.url}"')
+        self.assertContains(response, 'name="version"')
+
+    def test_text_edit_updates_only_text(self):
+        """Правка текста пишет text и версию одним UPDATE."""
+        response, updates = self.edit(text='Новый текст')
+        self.assertRedirects(
+            response, reverse('posts:post_detail', args=(self.post.id,))
+        )
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"version" = ("posts_post"."version" + 1)', updates[0])
+        self.assertIn('"text"', updates[0])
+        self.assertNotIn('"image"', updates[0])
+        self.assertNotIn('"group_id"', updates[0])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'Новый текст')
+        self.assertEqual(self.post.version, 2)
+
+    def test_unchanged_form_writes_nothing(self):
+        """Форма без изменений не обновляет пост."""
+        response, updates = self.edit()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(updates, [])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.version, 1)
+
+    def test_stale_version_is_rejected(self):
+        """Правка устаревшей версии не затирает чужие изменения."""
+        Post.objects.filter(pk=self.post.pk).update(
+            text='Чужая правка', version=2
+        )
+        response, updates = self.edit(text='Моя правка')
+        self.assertContains(response, EDIT_CONFLICT)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'Чужая правка')
+
+    def test_missing_version_falls_back_to_last_write(self):
+        """Правка без версии сохраняется без проверки и повышает версию."""
+        Post.objects.filter(pk=self.post.pk).update(version=2)
+        response = self.client.post(
+            self.url, {'text': 'Без версии', 'group': self.group.id}
+        )
+        self.assertRedirects(
+            response, reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'Без версии')
+        self.assertEqual(self.post.version, 3)
+
+    @mock.patch('posts.forms.delete_thumbnails')
+    def test_thumbnails_dropped_only_on_image_change(self, delete):
+        """Миниатюры удаляются, только когда заменили картинку."""
+        old_name = self.post.image.name
+        self.edit(text='Новый текст')
+        delete.assert_not_called()
+        self.edit(
+            version=2,
+            image=SimpleUploadedFile('new.gif', SMALL_GIF, 'image/gif'),
+        )
+        delete.assert_called_once()
+        self.assertEqual(delete.call_args[0][0].name, old_name)
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.image.name.startswith('posts/new'))
+
+    def test_search_index_follows_edit(self):
+        """Триггеры полнотекстового индекса работают после миграций."""
+        self.edit(text='Уникальное слово')
+        self.assertEqual(
+            search_posts('уникальное').posts, [self.post]
+        )
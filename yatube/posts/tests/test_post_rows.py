@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from ..management.commands.bench_post_list import sample_posts
+
+ARTICLES = (
+    "{% for post in posts %}\n"
+    "{% include 'posts/includes/article.html' with author_link=author_link "
+    "group_link=group_link %}\n"
+    "{% endfor %}"
+)
+
+ROWS = (
+    "{% load post_rows %}"
+    "{% post_rows posts author_link=author_link group_link=group_link "
+    "as rows %}"
+    "{% for row in rows %}\n"
+    "{% include 'posts/includes/post_row.html' %}\n"
+    "{% endfor %}"
+)
+
+
+class PostRowsTests(SimpleTestCase):
+    def test_same_html_as_article(self):
+        """Строки post_rows выводят тот же HTML, что article.html."""
+        posts = sample_posts(5)
+        for author_link in (True, False):
+            for group_link in (True, False):
+                context = {
+                    'posts': posts,
+                    'author_link': author_link,
+                    'group_link': group_link,
+                }
+                with self.subTest(author_link=author_link,
+                                  group_link=group_link):
+                    self.assertEqual(
+                        Template(ROWS).render(Context(context)),
+                        Template(ARTICLES).render(Context(context)),
+                    )
+
+    def test_benchmark_command(self):
+        """Команда бенчмарка сверяет HTML и печатает ускорение."""
+        out = StringIO()
+        call_command(
+            'bench_post_list', posts=3, repeat=1, stdout=out
+        )
+        self.assertIn('HTML совпадает', out.getvalue())
+        self.assertIn('Ускорение', out.getvalue())
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.query_budget import assert_query_budget, query_budget
+from ..models import Post
+from ..urls import app_name, urlpatterns
+from .budgets import QUERY_BUDGETS
+
+User = get_user_model()
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}')
+            for number in range(5)
+        )
+
+    def test_every_url_has_budget(self):
+        """Каждый адрес posts/urls.py объявляет бюджет запросов."""
+        for pattern in urlpatterns:
+            with self.subTest(name=pattern.name):
+                self.assertIn(f'{app_name}:{pattern.name}', QUERY_BUDGETS)
+
+    def test_budget_exceeded(self):
+        """Превышение числа запросов приводит к ошибке."""
+        with self.assertRaisesMessage(AssertionError, '2 запросов'):
+            with query_budget(1, 'test'):
+                list(Post.objects.all())
+                list(User.objects.all())
+
+    def test_n_plus_one_detected(self):
+        """Повторяющиеся запросы с разными параметрами — это N+1."""
+        @assert_query_budget(10)
+        def render_authors():
+            return [post.author.username for post in Post.objects.all()]
+
+        with self.assertRaisesMessage(AssertionError, 'N+1: 5'):
+            render_authors()
+
+    def test_select_related_fits_budget(self):
+        """Выборка с select_related укладывается в один запрос."""
+        with query_budget(1) as recorder:
+            authors = [
+                post.author.username
+                for post in Post.objects.select_related('author')
+            ]
+        self.assertEqual(len(authors), 5)
+        self.assertEqual(len(recorder), 1)
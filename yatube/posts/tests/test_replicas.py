@@ -0,0 +1,120 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.middleware import PRIMARY_UNTIL
+from core.routers import ReplicaRouter, use_primary, use_replica
+from users.cache import authors, load_user
+from ..cache import groups
+from ..models import Group, Post
+
+User = get_user_model()
+
+REPLICA = 'replica0'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(TestCase):
+    """В основной БД и в реплике лежат разные посты, поэтому по
+    содержимому страницы видно, откуда она прочитана.
+    """
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpTestData(cls):
+        for database, text in (('default', 'Пост основной БД'),
+                               (REPLICA, 'Пост реплики')):
+            user = User.objects.db_manager(database).create_user(
+                username='auth', id=1
+            )
+            group = Group.objects.using(database).create(
+                id=1, title='Группа', slug='group', description='Описание'
+            )
+            Post.objects.using(database).create(
+                author=user, group=group, text=text
+            )
+        cls.user = User.objects.get(username='auth')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_read_views_use_replica(self):
+        """Страницы из REPLICA_VIEWS читаются из реплики."""
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=('group',)),
+            reverse('posts:profile', args=('auth',)),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertContains(response, 'Пост реплики')
+
+    def test_other_views_use_primary(self):
+        """Остальные представления читают из основной БД."""
+        post = Post.objects.get()
+        response = self.authorized_client.get(
+            reverse('posts:post_edit', args=(post.id,))
+        )
+        self.assertContains(response, 'Пост основной БД')
+
+    def test_reads_stick_to_primary_after_write(self):
+        """После записи сессия читает свои изменения из основной БД,
+        минуя кеш ленты.
+        """
+        index = reverse('posts:index')
+        api_index = reverse('posts:api_index')
+        for page in (index, api_index):
+            self.authorized_client.get(page)
+            self.client.get(page)
+        self.authorized_client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        self.assertTrue(Post.objects.filter(text='Новый пост').exists())
+        self.assertFalse(
+            Post.objects.using(REPLICA).filter(text='Новый пост').exists()
+        )
+        self.assertContains(self.authorized_client.get(index), 'Новый пост')
+        self.assertNotContains(self.client.get(index), 'Новый пост')
+        results = self.authorized_client.get(api_index).json()['results']
+        self.assertEqual(results[0]['text'], 'Новый пост')
+        session = self.authorized_client.session
+        self.assertIn(PRIMARY_UNTIL, session)
+        session[PRIMARY_UNTIL] = 0
+        session.save()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Пост реплики')
+
+    def test_router(self):
+        """Запись всегда в default, чтение — в выбранную реплику."""
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Post))
+        use_replica()
+        try:
+            self.assertEqual(router.db_for_read(Post), REPLICA)
+            self.assertEqual(router.db_for_write(Post), 'default')
+        finally:
+            use_primary()
+        self.assertIsNone(router.db_for_read(Post))
+
+    def test_object_caches_fill_from_primary(self):
+        """Промах кеша объектов читается с основной БД, даже когда
+        запрос обслуживает реплика.
+        """
+        Group.objects.using(REPLICA).update(title='Устаревшая группа')
+        User.objects.db_manager(REPLICA).update(first_name='Устаревший')
+        User.objects.update(first_name='Свежий')
+        use_replica()
+        self.addCleanup(use_primary)
+        self.assertEqual(groups.get('group').title, 'Группа')
+        self.assertEqual(authors.get('auth').first_name, 'Свежий')
+        self.assertEqual(
+            load_user(ModelBackend(), self.user.pk).first_name, 'Свежий'
+        )
+        self.assertEqual(ReplicaRouter().db_for_read(Post), REPLICA)
@@ -0,0 +1,107 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..search import FTS_TABLE, search_posts
+
+User = get_user_model()
+
+
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Котики и собаки живут вместе',
+            group=cls.group,
+        )
+        cls.often = Post.objects.create(
+            author=cls.other,
+            text='Котики котики котики',
+        )
+        for i in range(5):
+            Post.objects.create(author=cls.user, text=f'Котики пост {i}')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_search_ranks_by_bm25(self):
+        """Самый релевантный пост выдаётся первым."""
+        page = search_posts('котики')
+        self.assertEqual(page.posts[0], self.often)
+        self.assertIn('<mark>', page.posts[0].snippet)
+
+    def test_search_filters(self):
+        """Поиск учитывает фильтры по группе и автору."""
+        self.assertEqual(
+            search_posts('котики', group=self.group).posts, [self.post]
+        )
+        self.assertEqual(
+            search_posts('котики', author=self.other).posts, [self.often]
+        )
+
+    def test_unknown_author_gives_no_results(self):
+        """Фильтр по несуществующему автору даёт пустую выдачу, а не 404."""
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'котики', 'author': 'nobody'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page'].posts, [])
+
+    def test_search_cursor_pagination(self):
+        """Курсор отдаёт следующую страницу без повторов."""
+        first = search_posts('котики', limit=4)
+        second = search_posts('котики', cursor=first.next_cursor, limit=4)
+        self.assertIsNotNone(first.next_cursor)
+        self.assertIsNone(second.next_cursor)
+        ids = [post.id for post in first.posts + second.posts]
+        self.assertEqual(len(ids), Post.objects.count())
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_index_follows_post_changes(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Попугаи'
+        post.save()
+        self.assertEqual(search_posts('попугаи').posts, [post])
+        post.delete()
+        self.assertEqual(search_posts('попугаи').posts, [])
+
+    def test_query_syntax_is_escaped(self):
+        """Спецсимволы FTS5 в запросе не приводят к ошибке."""
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'котики" OR (NEAR'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_search_page_escapes_text(self):
+        """Текст поста в сниппете экранируется."""
+        Post.objects.create(author=self.user, text='<script>жирафы</script>')
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'жирафы'}
+        )
+        self.assertContains(response, '&lt;script&gt;')
+        self.assertNotContains(response, '<script>')
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"
+            )
+        self.assertEqual(search_posts('котики').posts, [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(search_posts('котики', limit=20).posts), 7)
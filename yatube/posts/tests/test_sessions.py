@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.cache import user_key
+
+User = get_user_model()
+
+
+class CachedSessionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth', password='pass')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def auth_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'django_session' in query['sql']
+            or 'FROM "auth_user" WHERE "auth_user"."id"' in query['sql']
+        ]
+
+    def test_warm_request_skips_session_and_user(self):
+        """Сессия и пользователь читаются из кеша, без запросов к БД."""
+        url = reverse('posts:follow_index')
+        self.assertEqual(len(self.auth_queries(url)), 1)
+        self.assertEqual(self.auth_queries(url), [])
+
+    def test_session_survives_cache_flush(self):
+        """Сессия пишется и в БД, поэтому переживает сброс кеша."""
+        cache.clear()
+        self.assertEqual(len(self.auth_queries(
+            reverse('posts:follow_index')
+        )), 2)
+
+    def test_password_change_invalidates_cached_user(self):
+        """Смена пароля сбрасывает кеш и завершает другие сессии."""
+        url = reverse('posts:follow_index')
+        self.client.get(url)
+        self.assertIsNotNone(cache.get(user_key(self.user.pk)))
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-pass')
+        user.save()
+        self.assertIsNone(cache.get(user_key(self.user.pk)))
+        response = self.client.get(url)
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={url}'
+        )
+
+    def test_logout_forgets_user(self):
+        """Выход удаляет пользователя из кеша."""
+        self.client.get(reverse('posts:follow_index'))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(user_key(self.user.pk)))
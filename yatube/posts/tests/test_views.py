@@ -1,6 +1,9 @@
 import shutil
 import tempfile
+from datetime import timedelta
+
 from django.conf import settings
+from django.utils import timezone
 
 from django.core.cache import cache
 from django import forms
@@ -8,13 +11,54 @@ from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
-from ..models import Group, Post, Follow
+from ..bulk import preserved_timestamps
+from ..models import Comment, Group, Post, Follow
+from core.query_budget import BudgetClient
+from .budgets import QUERY_BUDGETS
 from django.core.cache import cache
 from django.test import TestCase, Client, override_settings
 
 
 User = get_user_model()
 
+BACKGROUND_AUTHORS = 20
+
+BACKGROUND_POSTS = 300
+
+
+def create_background(post):
+    """Создаёт сотни старых постов и комментариев других авторов.
+
+    Посты старше тестовых и лежат в отдельной группе, поэтому не
+    влияют на проверки содержимого страниц, но дают выборкам
+    реальный объём для проверки бюджета запросов.
+    """
+    group = Group.objects.create(
+        title='Фоновая группа',
+        slug='background',
+        description='Фоновые посты',
+    )
+    User.objects.bulk_create(
+        User(username=f'background{number}')
+        for number in range(BACKGROUND_AUTHORS)
+    )
+    authors = list(User.objects.filter(username__startswith='background'))
+    started = timezone.now() - timedelta(days=1)
+    with preserved_timestamps():
+        Post.objects.bulk_create(
+            Post(
+                author=authors[number % len(authors)],
+                group=group,
+                text=f'Фоновый пост {number}',
+                pub_date=started - timedelta(minutes=number),
+            )
+            for number in range(BACKGROUND_POSTS)
+        )
+    Comment.objects.bulk_create(
+        Comment(post=post, author=author, text='Фоновый комментарий')
+        for author in authors
+    )
+
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -55,6 +99,7 @@ class PostPagesTests(TestCase):
             group=cls.group,
             image=cls.uploaded
         )
+        create_background(cls.post)
 
     @classmethod
     def tearDownClass(cls):
@@ -74,8 +119,8 @@ class PostPagesTests(TestCase):
 
     def setUp(self):
         cache.clear()
-        self.guest_client = Client()
-        self.authorized_client = Client()
+        self.guest_client = BudgetClient(QUERY_BUDGETS)
+        self.authorized_client = BudgetClient(QUERY_BUDGETS)
         self.authorized_client.force_login(self.user)
 
     def test_pages_uses_correct_template(self):
@@ -316,7 +361,7 @@ class PaginatorViewsTest(TestCase):
 
     def setUp(self):
         cache.clear()
-        self.guest_client = Client()
+        self.guest_client = BudgetClient(QUERY_BUDGETS)
 
     def test_first_page_contains_ten_records(self):
         templates_pages_names = {
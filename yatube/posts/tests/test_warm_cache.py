@@ -0,0 +1,108 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..management.commands.warm_cache import log_paths
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+ACCESS_ENTRY = (
+    '127.0.0.1 - - [19/Oct/2026:10:00:00 +0000] "{} {} HTTP/1.1" {} 512 '
+    '"-" "bot"\n'
+)
+
+ACCESS_LOG = ''.join(
+    ACCESS_ENTRY.format(method, path, status) for method, path, status in (
+        ('GET', '/group/group/', 200),
+        ('GET', '/group/group/', 200),
+        ('POST', '/create/', 200),
+        ('GET', '/missing/', 404),
+    )
+) + '{"method": "GET", "path": "/posts/1/", "status": 200}\n'
+
+
+class WarmCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Пост'
+        )
+        Comment.objects.create(post=cls.post, author=cls.user, text='Текст')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.group_url = reverse('posts:group_list', args=(self.group.slug,))
+
+    def warm(self, **options):
+        out = StringIO()
+        call_command(
+            'warm_cache', workers=1, host='testserver', stdout=out, **options
+        )
+        return out.getvalue()
+
+    def test_group_page_cached_until_new_post(self):
+        """Страница группы берётся из кеша, пока не появится новый пост."""
+        self.client.get(self.group_url)
+        with self.assertNumQueries(0):
+            self.client.get(self.group_url)
+        Post.objects.create(author=self.user, group=self.group, text='Новый')
+        self.assertContains(self.client.get(self.group_url), 'Новый')
+
+    def test_authenticated_pages_are_not_cached(self):
+        """Залогиненным страница строится заново."""
+        self.client.force_login(self.user)
+        self.client.get(self.group_url)
+        Post.objects.filter(pk=self.post.pk).update(text='Изменён')
+        self.assertContains(self.client.get(self.group_url), 'Изменён')
+
+    def test_command_warms_hot_pages(self):
+        """После прогрева главная, страницы групп и постов отдаются
+        по https без запросов к БД.
+        """
+        output = self.warm(index_pages=1, groups=1, group_pages=1, posts=1)
+        self.assertIn('Прогрето 3 адресов', output)
+        for url in (
+            reverse('posts:index'),
+            self.group_url,
+            reverse('posts:post_detail', args=(self.post.id,)),
+        ):
+            with self.subTest(url=url):
+                with self.assertNumQueries(0):
+                    self.client.get(url, secure=True)
+
+    def test_command_requires_host(self):
+        """Без --host и --base-url прогревать некуда."""
+        with self.assertRaises(CommandError):
+            call_command('warm_cache', stdout=StringIO())
+
+    def test_command_replays_access_log(self):
+        """Адреса для прогрева можно взять из access log."""
+        handle, path = tempfile.mkstemp()
+        with os.fdopen(handle, 'w') as target:
+            target.write(ACCESS_LOG)
+        try:
+            output = self.warm(log=path, top=1)
+        finally:
+            os.remove(path)
+        self.assertIn('Прогрето 1 адресов', output)
+        with self.assertNumQueries(0):
+            self.client.get(self.group_url, secure=True)
+
+    def test_log_paths(self):
+        """Из лога берутся только успешные GET-запросы."""
+        self.assertEqual(
+            list(log_paths(ACCESS_LOG.splitlines())),
+            ['/group/group/', '/group/group/', '/posts/1/'],
+        )
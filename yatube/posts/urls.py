@@ -1,15 +1,24 @@
 from django.urls import path
 
-from . import views
+from . import api, views
+from .feeds import (AuthorPostsAtomFeed, AuthorPostsFeed, GroupPostsAtomFeed,
+                    GroupPostsFeed, LatestPostsAtomFeed, LatestPostsFeed,
+                    cached_feed)
 
 app_name = "posts"
 
 urlpatterns = [
     path("group/<slug:slug>/", views.group_list, name="group_list"),
     path("", views.index, name="index"),
+    path('search/', views.search, name='search'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/export/',
+        views.profile_export,
+        name='profile_export'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path(
         'posts/<int:post_id>/comment/',
@@ -27,4 +36,43 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('feeds/rss/', cached_feed(LatestPostsFeed()), name='index_rss'),
+    path('feeds/atom/', cached_feed(LatestPostsAtomFeed()), name='index_atom'),
+    path(
+        'group/<slug:slug>/rss/',
+        cached_feed(GroupPostsFeed()),
+        name='group_rss'
+    ),
+    path(
+        'group/<slug:slug>/atom/',
+        cached_feed(GroupPostsAtomFeed()),
+        name='group_atom'
+    ),
+    path(
+        'profile/<str:username>/rss/',
+        cached_feed(AuthorPostsFeed()),
+        name='profile_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        cached_feed(AuthorPostsAtomFeed()),
+        name='profile_atom'
+    ),
+    path('api/v1/posts/', api.index, name='api_index'),
+    path('api/v1/group/<slug:slug>/', api.group_list, name='api_group_list'),
+    path(
+        'api/v1/profile/<str:username>/',
+        api.profile,
+        name='api_profile'
+    ),
+    path(
+        'api/v1/posts/<int:post_id>/',
+        api.post_detail,
+        name='api_post_detail'
+    ),
+    path(
+        'api/v1/posts/<int:post_id>/comments/',
+        api.comments,
+        name='api_comments'
+    ),
 ]
@@ -1,8 +1,120 @@
+import base64
+from hashlib import md5
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Max, Min, QuerySet
+from django.utils.functional import cached_property
+
+COUNT_CACHE_TIME = 60
+
+ELLIPSIS = '…'
 
 
 def get_page_context(object_list, request):
     return Paginator(object_list, settings.PAGE_COUNT).get_page(
         request.GET.get('page')
     )
+
+
+def elided_page_range(paginator, number, on_each_side=3, on_ends=2):
+    """Номера страниц вокруг текущей, первые и последние, с ELLIPSIS
+    на месте пропусков — как Paginator.get_elided_page_range в Django 3.2.
+
+    Длина не зависит от числа страниц, поэтому вывод пагинатора ленты
+    из миллиона постов не больше, чем из сотни.
+    """
+    number = int(number)
+    num_pages = paginator.num_pages
+    if num_pages <= (on_each_side + on_ends) * 2:
+        yield from paginator.page_range
+        return
+    if number > 1 + on_each_side + on_ends + 1:
+        yield from range(1, on_ends + 1)
+        yield ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator без COUNT(*) по всей таблице.
+
+    Для queryset без фильтров число строк оценивается по MIN(id) и
+    MAX(id), что обходится двумя поисками по первичному ключу. После
+    удалений и архивации оценка завышена, поэтому page() читает на
+    строку больше страницы: если следующей строки нет, число строк
+    становится точным и лишние страницы пропадают. Точный COUNT
+    для отфильтрованных выборок кешируется на COUNT_CACHE_TIME.
+    """
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        if not queryset.query.where:
+            bounds = queryset.order_by().aggregate(
+                low=Min('pk'), high=Max('pk')
+            )
+            if bounds['high'] is None:
+                return 0
+            self.estimated = True
+            return bounds['high'] - bounds['low'] + 1
+        key = 'paginator_count:' + md5(
+            str(queryset.query).encode()
+        ).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, COUNT_CACHE_TIME)
+        return count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if len(rows) > self.per_page:
+            return self._get_page(rows[:self.per_page], number, self)
+        if rows or number == 1:
+            self.clamp(bottom + len(rows))
+            return self._get_page(rows, number, self)
+        # Страница целиком за концом выборки: оценка завышена больше
+        # чем на страницу, и номер такой же неверный, как у Paginator.
+        raise EmptyPage('Страница не содержит результатов')
+
+    def clamp(self, count):
+        """Заменяет оценку точным числом строк."""
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+        self.estimated = False
+
+
+def encode_cursor(*values):
+    raw = '|'.join(str(value) for value in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, *types):
+    """Разбирает курсор, приводя его части к типам types.
+
+    При любой ошибке формата бросает ValueError.
+    """
+    try:
+        values = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    except (ValueError, UnicodeError):
+        raise ValueError('Некорректный курсор')
+    if len(values) != len(types):
+        raise ValueError('Некорректный курсор')
+    return tuple(cast(value) for cast, value in zip(types, values))
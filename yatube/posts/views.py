@@ -1,55 +1,131 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseRedirect
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
 
-from .forms import CommentForm, PostForm
-from .models import Group, Post, Follow
+from users.cache import authors
+from .archive import TieredPosts
+from .cache import cache_page_unless_pinned, groups, versioned_cache_page
+from .export import FORMATS, export_stream
+from .forms import CommentForm, EditConflict, PostForm, SearchForm
+from .models import ArchivedPost, Post, Follow
+from .search import SearchPage, search_posts
 from .utils import get_page_context
 
 User = get_user_model()
 
 CACHE_TIME = 20
 
+EDIT_CONFLICT = (
+    'Пост уже изменили в другой вкладке или другим устройством. '
+    'Откройте правку заново, чтобы не потерять чужие изменения.'
+)
 
-@cache_page(20)
+# Страницы с posts_version() в ключе кеша не устаревают, поэтому
+# хранятся дольше CACHE_TIME.
+PAGE_CACHE_TIME = 60 * 5
+
+
+@cache_page_unless_pinned(CACHE_TIME)
 def index(request):
     context = {
         'group_link': 'group_link',
         'author_link': 'author_link',
-        'page_obj': get_page_context(Post.objects.all(), request)
+        'page_obj': get_page_context(Post.objects.feed(), request)
     }
     return render(request, 'posts/index.html', context)
 
 
+@versioned_cache_page(PAGE_CACHE_TIME)
 def group_list(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = groups.get_or_404(slug)
     context = {
         'group': group,
         'author_link': 'author_link',
         'group_link': 'group_link',
-        'page_obj': get_page_context(group.posts.all(), request)
+        'page_obj': get_page_context(
+            TieredPosts(group.posts.feed(), group.archived_posts.feed()),
+            request,
+        )
     }
     return render(request, 'posts/group_list.html', context)
 
 
+def search(request):
+    form = SearchForm(request.GET or None)
+    page = None
+    next_query = None
+    if form.is_valid():
+        author = None
+        if form.cleaned_data['author']:
+            author = authors.get(form.cleaned_data['author'])
+        if form.cleaned_data['author'] and author is None:
+            # Постов неизвестного автора нет — это пустая выдача, не 404.
+            page = SearchPage([], None)
+        else:
+            page = search_posts(
+                form.cleaned_data['q'],
+                group=form.cleaned_data['group'],
+                author=author,
+                cursor=form.cleaned_data['cursor'],
+            )
+        if page.next_cursor:
+            query = request.GET.copy()
+            query['cursor'] = page.next_cursor
+            next_query = query.urlencode()
+    context = {
+        'form': form,
+        'page': page,
+        'next_query': next_query,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = authors.get_or_404(username)
     user = request.user
     following = user.is_authenticated and user.following.exists()
     context = {
         'author': author,
-        'page_obj': get_page_context(author.posts.all(), request),
+        'page_obj': get_page_context(
+            TieredPosts(author.posts.feed(), author.archived_posts.feed()),
+            request,
+        ),
         'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@login_required
+def profile_export(request, username):
+    author = authors.get_or_404(username)
+    if request.user != author and not request.user.is_staff:
+        raise PermissionDenied
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in FORMATS:
+        export_format = 'ndjson'
+    gzip = request.GET.get('gzip') == '1'
+    filename = f'{author.username}.{export_format}'
+    content_type = FORMATS[export_format]
+    if gzip:
+        filename += '.gz'
+        content_type = 'application/gzip'
+    response = StreamingHttpResponse(
+        export_stream(author, export_format, gzip),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@versioned_cache_page(PAGE_CACHE_TIME)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = Post.objects.feed().filter(id=post_id).first()
+    if post is None:
+        post = get_object_or_404(ArchivedPost.objects.feed(), id=post_id)
     form = CommentForm(data=request.POST or None)
-    comments = post.comments.all()
+    comments = post.comments.select_related('author').order_by('-created')
     following = (
         request.user.is_authenticated
         and post.author.following.filter(user=request.user).exists()
@@ -88,13 +164,17 @@ def post_edit(request, post_id):
     )
     if request.user != post.author:
         return redirect('posts:post_detail', post_id)
-    if request.method == 'POST':
-        if form.is_valid():
+    if request.method == 'POST' and form.is_valid():
+        try:
             form.save()
+        except EditConflict:
+            form.add_error(None, EDIT_CONFLICT)
+        else:
             return redirect('posts:post_detail', post_id)
     context = {
         'form': form,
         'is_edit': 'is_edit',
+        'post_id': post_id,
     }
     return render(
         request, 'posts/create_post.html', context)
@@ -115,7 +195,7 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     follower = Follow.objects.filter(user=request.user).values('author')
-    post_list = Post.objects.filter(author__in=follower)
+    post_list = Post.objects.feed().filter(author__in=follower)
     context = {
         'page_obj': get_page_context(post_list, request),
     }
@@ -124,7 +204,7 @@ def follow_index(request):
 
 @login_required
 def profile_follow(request, username):
-    author = User.objects.get(username=username)
+    author = authors.get_or_404(username)
     user = request.user
     if author != user:
         Follow.objects.get_or_create(user=user, author=author)
@@ -137,6 +217,6 @@ def profile_follow(request, username):
 
 @login_required
 def profile_unfollow(request, username):
-    user = request.user
-    Follow.objects.get(user=user, author__username=username).delete()
+    author = authors.get_or_404(username)
+    get_object_or_404(Follow, user=request.user, author=author).delete()
     return HttpResponseRedirect(request.META.get('HTTP_REFERER'))
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 get_user_model, load_backend)
+from django.contrib.auth import _get_user_session_key
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+from core.object_cache import ObjectCache
+from core.routers import primary_reads
+
+USER_CACHE_TIME = 60 * 15
+
+authors = ObjectCache(get_user_model(), 'username', 'user')
+
+
+def user_key(user_id):
+    return f'users:user:{user_id}'
+
+
+def forget_user(user_id):
+    cache.delete(user_key(user_id))
+
+
+def load_user(backend, user_id):
+    """Пользователь из кеша, при промахе — из backend с записью в кеш.
+
+    Промах читается с основной БД: после изменения пользователя запись
+    сбрасывается, и реплика не должна вернуть в кеш старую версию.
+    """
+    key = user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        with primary_reads():
+            user = backend.get_user(user_id)
+        if user is not None:
+            cache.set(key, user, USER_CACHE_TIME)
+    return user
+
+
+def get_user(request):
+    """Как django.contrib.auth.get_user, но пользователь берётся из кеша.
+
+    Хеш сессии сверяется с закешированным пользователем так же, как
+    в Django, поэтому смена пароля (она сбрасывает запись в кеше)
+    по-прежнему завершает остальные сессии.
+    """
+    user = None
+    try:
+        user_id = _get_user_session_key(request)
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        pass
+    else:
+        if backend_path in settings.AUTHENTICATION_BACKENDS:
+            user = load_user(load_backend(backend_path), user_id)
+            if hasattr(user, 'get_session_auth_hash'):
+                session_hash = request.session.get(HASH_SESSION_KEY)
+                verified = session_hash and constant_time_compare(
+                    session_hash, user.get_session_auth_hash()
+                )
+                if not verified:
+                    request.session.flush()
+                    user = None
+    return user or AnonymousUser()
@@ -50,13 +50,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.MemoryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -90,9 +95,51 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплики только для чтения: пути к копиям БД через запятую
+# в YATUBE_REPLICAS.
+REPLICA_PATHS = [
+    path for path in os.environ.get('YATUBE_REPLICAS', '').split(',') if path
+]
+
+for number, path in enumerate(REPLICA_PATHS):
+    DATABASES[f'replica{number}'] = dict(DATABASES['default'], NAME=path)
+
+DATABASE_REPLICAS = [
+    f'replica{number}' for number in range(len(REPLICA_PATHS))
+]
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Представления, чтения которых можно отдать реплике.
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
+)
+
+# Сколько секунд после записи сессия читает только с основной БД.
+REPLICA_STICKY_SECONDS = 10
+
+# PRAGMA для каждого нового соединения SQLite (core.db): WAL позволяет
+# читать во время записи, NORMAL в режиме WAL не теряет целостность.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Проверять постоянные соединения в начале каждого запроса.
+DB_HEALTH_CHECKS = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -140,7 +187,18 @@ LOGIN_REDIRECT_URL = 'posts:index'
 
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма ставятся в очередь (core.mail.OutboxBackend) и доставляются
+# командой send_outbox через OUTBOX_EMAIL_BACKEND.
+EMAIL_BACKEND = 'core.mail.OutboxBackend'
+
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+# Повторы доставки: задержка удваивается от OUTBOX_RETRY_DELAY до
+# OUTBOX_MAX_RETRY_DELAY секунд, после OUTBOX_MAX_ATTEMPTS попыток
+# письмо помечается недоставленным.
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_MAX_RETRY_DELAY = 60 * 60
+OUTBOX_MAX_ATTEMPTS = 8
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
@@ -157,3 +215,99 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Сессии читаются из кеша, а пишутся и в кеш, и в БД: после сброса
+# кеша пользователи остаются залогиненными.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Кеш групп по slug и авторов по username (core.object_cache).
+# Отсутствующие объекты кешируются на OBJECT_CACHE_MISSING_TIME, а
+# кеш процесса хранит до OBJECT_CACHE_L1_SIZE объектов не дольше
+# OBJECT_CACHE_L1_SECONDS.
+OBJECT_CACHE_TIME = 60 * 15
+OBJECT_CACHE_MISSING_TIME = 60
+OBJECT_CACHE_L1_SIZE = 1024
+OBJECT_CACHE_L1_SECONDS = 5
+
+# Доля запросов с заголовком Server-Timing и строкой в логе yatube.timing;
+# по умолчанию замеры выключены, например YATUBE_SERVER_TIMING_RATE=0.01.
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.environ.get('YATUBE_SERVER_TIMING_RATE', 0)
+)
+
+# Файлы метрик воркеров, общие для всех процессов на машине.
+METRICS_DIR = os.environ.get(
+    'YATUBE_METRICS_DIR', os.path.join(BASE_DIR, 'yatube-metrics')
+)
+
+# Токен сборщика метрик для /metrics/ (заголовок Authorization:
+# Bearer <токен>); без него эндпоинт доступен только сотрудникам.
+METRICS_TOKEN = os.environ.get('YATUBE_METRICS_TOKEN', '')
+
+# Журнал медленных запросов включается порогом в миллисекундах.
+SLOW_QUERY_THRESHOLD_MS = (
+    float(os.environ['YATUBE_SLOW_QUERY_MS'])
+    if os.environ.get('YATUBE_SLOW_QUERY_MS') else None
+)
+
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'logs', 'slow_queries.jsonl')
+
+# Один и тот же медленный запрос пишется не чаще раза в интервал, с.
+SLOW_QUERY_INTERVAL = 60
+
+# Каждый N-й запрос снимается семплером стеков (0 — никакой); запросы
+# с подписанным заголовком X-Profile (команда profile_token) — ещё
+# и cProfile.
+PROFILING_EVERY = int(os.environ.get('YATUBE_PROFILE_EVERY', 0))
+
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+
+# Интервал семплирования стека, с: для запросов с X-Profile
+# и для выборочных запросов.
+PROFILING_INTERVAL = 0.001
+PROFILING_SAMPLED_INTERVAL = 0.01
+
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+
+# Диагностика памяти через tracemalloc; замедляет запросы, включать
+# на время расследования.
+MEMORY_TRACKING = os.environ.get('YATUBE_MEMORY_TRACKING') == '1'
+
+MEMORY_BUDGET_KB = 20 * 1024
+
+MEMORY_FRAMES = 1
+
+MEMORY_TOP_SITES = 10
+
+MEMORY_LOG = os.path.join(BASE_DIR, 'logs', 'memory.jsonl')
+
+# Прогрев процесса при загрузке yatube.wsgi (core.warmup).
+WARMUP = os.environ.get('YATUBE_WARMUP', '1') == '1'
+
+# Сколько групп положить в кеш при прогреве: самые частые среди
+# последних WARMUP_POSTS постов.
+WARMUP_GROUPS = 50
+WARMUP_POSTS = 1000
+
+LOG_LEVEL = os.environ.get('YATUBE_LOG_LEVEL', 'INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'yatube': {
+            'handlers': ['console'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,22 @@
+"""Настройки тестов: их берут manage.py test и pytest (pytest.ini)."""
+import os
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, LOGGING
+
+# Отдельная БД для тестов маршрутизации по репликам; чтения на неё
+# включаются через override_settings(DATABASE_REPLICAS=...).
+DATABASES['replica0'] = dict(
+    DATABASES['default'], NAME=os.path.join(BASE_DIR, 'replica.sqlite3')
+)
+DATABASE_REPLICAS = []
+
+# cache.clear() кеш процесса не сбрасывает.
+OBJECT_CACHE_L1_SIZE = 0
+
+METRICS_DIR = os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+
+# Служебные логи в выводе тестов не нужны.
+LOG_LEVEL = os.environ.get('YATUBE_LOG_LEVEL', 'WARNING')
+LOGGING['loggers']['yatube']['level'] = LOG_LEVEL